@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Shared HTTP connection pool for the scrapers
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pooled keep-alive connections per host (ereklamblad.se, api.ereklamblad.se)
+POOL_MAXSIZE = 64
+
+# Retry transient server errors and rate limiting with backoff; the final
+# response is still returned so callers' status checks keep working
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=('GET', 'HEAD'),
+    raise_on_status=False
+)
+
+# One adapter, and so one urllib3 pool manager, for every scraper in the process
+_ADAPTER = HTTPAdapter(max_retries=_RETRY, pool_connections=32, pool_maxsize=POOL_MAXSIZE)
+
+
+def get_session(headers=None) -> requests.Session:
+    """Create a session that draws its connections from the shared pool
+
+    Sessions stay separate so each scraper keeps its own default headers,
+    while TCP/TLS connections are reused across all of them.
+    """
+    session = requests.Session()
+    session.mount('https://', _ADAPTER)
+    session.mount('http://', _ADAPTER)
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -6,6 +6,7 @@ DeepSeek AI Analyzer for Locopon
 Intelligent analysis of Swedish retail offers
 """
 
+import asyncio
 import json
 import logging
 from typing import List, Optional
@@ -20,7 +21,12 @@ logger = logging.getLogger(__name__)
 class DeepSeekAnalyzer:
     """DeepSeek AI-powered offer analysis system"""
     
+    # Offers included in the summary prompt, limited for context size
+    SUMMARY_OFFER_LIMIT = 20
+    
     def __init__(self, api_key: str, base_url: str = "https://api.deepseek.com"):
+        self.api_key = api_key
+        self.base_url = base_url
         self.client = openai.OpenAI(
             api_key=api_key,
             base_url=base_url
@@ -32,42 +38,67 @@ class DeepSeekAnalyzer:
         logger.info(f"Analyzing offer: {offer.name} ({offer.id})")
         
         try:
-            # Prepare offer context
-            offer_context = self._prepare_offer_context(offer)
-            
-            # Create analysis prompt
-            prompt = self._create_analysis_prompt(offer_context)
-            
             # Get AI analysis
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert Swedish retail analyst specializing in grocery and consumer goods pricing, trends, and consumer behavior. Provide detailed, accurate analysis in JSON format."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000
+                **self._analysis_request(offer)
             )
             
-            # Parse response
-            analysis_data = self._parse_ai_response(response.choices[0].message.content)
+            return self._analysis_from_response(offer, response)
+                
+        except Exception as e:
+            logger.error(f"Error analyzing offer {offer.id}: {e}")
+            return None
+    
+    async def _analyze_offer_async(self, client: "openai.AsyncOpenAI", offer: Offer) -> Optional[OfferAnalysis]:
+        """Analyze a single offer using an async DeepSeek client"""
+        logger.info(f"Analyzing offer: {offer.name} ({offer.id})")
+        
+        try:
+            response = await client.chat.completions.create(
+                **self._analysis_request(offer)
+            )
             
-            if analysis_data:
-                return self._create_offer_analysis(offer.id, analysis_data)
-            else:
-                logger.warning(f"Failed to parse AI response for offer: {offer.id}")
-                return None
+            return self._analysis_from_response(offer, response)
                 
         except Exception as e:
             logger.error(f"Error analyzing offer {offer.id}: {e}")
             return None
     
+    def _analysis_request(self, offer: Offer) -> dict:
+        """Build chat completion arguments for analyzing an offer"""
+        # Prepare offer context
+        offer_context = self._prepare_offer_context(offer)
+        
+        # Create analysis prompt
+        prompt = self._create_analysis_prompt(offer_context)
+        
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert Swedish retail analyst specializing in grocery and consumer goods pricing, trends, and consumer behavior. Provide detailed, accurate analysis in JSON format."
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1000,
+        }
+    
+    def _analysis_from_response(self, offer: Offer, response) -> Optional[OfferAnalysis]:
+        """Turn a chat completion response into an OfferAnalysis"""
+        # Parse response
+        analysis_data = self._parse_ai_response(response.choices[0].message.content)
+        
+        if analysis_data:
+            return self._create_offer_analysis(offer.id, analysis_data)
+        else:
+            logger.warning(f"Failed to parse AI response for offer: {offer.id}")
+            return None
+    
     def analyze_batch(self, offers: List[Offer], max_batch_size: int = 10) -> List[OfferAnalysis]:
         """Analyze multiple offers in batches"""
         logger.info(f"Starting batch analysis of {len(offers)} offers")
@@ -90,6 +121,28 @@ class DeepSeekAnalyzer:
         logger.info(f"Batch analysis complete: {len(analyses)} successful analyses")
         return analyses
     
+    async def analyze_batch_async(self, offers: List[Offer], concurrency: int = 8) -> List[OfferAnalysis]:
+        """Analyze multiple offers concurrently, at most `concurrency` requests at a time"""
+        logger.info(f"Starting concurrent analysis of {len(offers)} offers")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # The async client is bound to the running event loop, so create it
+        # per batch rather than sharing one across asyncio.run() calls
+        async with openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url) as client:
+            async def analyze(offer: Offer) -> Optional[OfferAnalysis]:
+                async with semaphore:
+                    analysis = await self._analyze_offer_async(client, offer)
+                if not analysis:
+                    logger.warning(f"Analysis failed: {offer.name}")
+                return analysis
+            
+            results = await asyncio.gather(*(analyze(offer) for offer in offers))
+        
+        analyses = [analysis for analysis in results if analysis]
+        logger.info(f"Concurrent analysis complete: {len(analyses)} successful analyses")
+        return analyses
+    
     def _prepare_offer_context(self, offer: Offer) -> dict:
         """Prepare offer data for AI analysis"""
         context = {
@@ -253,8 +306,9 @@ Keep it concise but informative (max 500 words).
         # Create analysis lookup
         analysis_map = {a.offer_id: a for a in analyses}
         
+        # Only the first offers fit in the prompt, so don't format the rest
         offers_with_analysis = []
-        for offer in offers:
+        for offer in offers[:self.SUMMARY_OFFER_LIMIT]:
             analysis = analysis_map.get(offer.id)
             offer_data = {
                 "name": offer.name,
@@ -275,7 +329,7 @@ Keep it concise but informative (max 500 words).
         return {
             "total_offers": len(offers),
             "analyzed_offers": len(analyses),
-            "offers": offers_with_analysis[:20],  # Limit for context size
+            "offers": offers_with_analysis,
         }
     
     def health_check(self) -> bool:
@@ -69,15 +69,18 @@ class ConfigManager:
                 'timeout': 30,
                 'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             },
+            'scrape_workers': 8,
             
             # DeepSeek AI settings
             'deepseek_api_key': None,
             'deepseek_base_url': 'https://api.deepseek.com',
             'max_analysis_per_run': 20,
+            'analysis_concurrency': 8,
             
             # Telegram settings
             'telegram_bot_token': None,
             'telegram_chat_id': None,
+            'notify_top_k': 25,
             
             # Scheduling settings
             'schedule': {
@@ -97,6 +100,7 @@ class ConfigManager:
             
             # Data retention settings
             'cleanup_days': 30,
+            'db_size_limit_mb': 1000,
             
             # Logging settings
             'logging': {
@@ -21,18 +21,32 @@ logger = logging.getLogger(__name__)
 class DatabaseManager:
     """SQLite database manager for Locopon system"""
     
+    # Max bound parameters per IN (...) query
+    _MAX_QUERY_PARAMS = 900
+    
     def __init__(self, db_path: str = "data/locopon.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._initialize_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for short batched writes"""
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        # WAL (set once at init) makes NORMAL durable enough and avoids an
+        # fsync per commit
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
     def _initialize_database(self):
         """Initialize database schema"""
         logger.info(f"Initializing database: {self.db_path}")
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
+            # Write-ahead log is persistent, so it only needs to be set once
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Create offers table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS offers (
@@ -127,6 +141,7 @@ class DatabaseManager:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_offers_active ON offers(is_active)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_offer ON offer_analyses(offer_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_category ON offer_analyses(category)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_price_category ON offer_analyses(price_category, offer_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_started ON scraping_sessions(started_at)')
             
             conn.commit()
@@ -135,7 +150,7 @@ class DatabaseManager:
     def save_offer(self, offer: Offer) -> bool:
         """Save or update an offer"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Check if offer exists
@@ -193,7 +208,7 @@ class DatabaseManager:
         saved_count = 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
                 
@@ -249,29 +264,38 @@ class DatabaseManager:
         
         return saved_count
     
+    _INSERT_ANALYSIS_SQL = '''
+        INSERT INTO offer_analyses (
+            offer_id, category, subcategory, brand, price_category, value_score,
+            deal_quality, target_audience, purchase_urgency, seasonal_relevance,
+            recommendation, pros, cons, analysis_model, confidence_score,
+            processed_at, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def _analysis_params(self, analysis: OfferAnalysis, now: str) -> tuple:
+        """Build the insert parameters for an analysis row"""
+        return (
+            analysis.offer_id, analysis.category, analysis.subcategory, analysis.brand,
+            analysis.price_category.value if analysis.price_category else None,
+            analysis.value_score, analysis.deal_quality, analysis.target_audience,
+            analysis.purchase_urgency, analysis.seasonal_relevance, analysis.recommendation,
+            json.dumps(analysis.pros) if analysis.pros else None,
+            json.dumps(analysis.cons) if analysis.cons else None,
+            analysis.analysis_model, analysis.confidence_score,
+            analysis.processed_at.isoformat(), now
+        )
+    
     def save_analysis(self, analysis: OfferAnalysis) -> bool:
         """Save offer analysis"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO offer_analyses (
-                        offer_id, category, subcategory, brand, price_category, value_score,
-                        deal_quality, target_audience, purchase_urgency, seasonal_relevance,
-                        recommendation, pros, cons, analysis_model, confidence_score,
-                        processed_at, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    analysis.offer_id, analysis.category, analysis.subcategory, analysis.brand,
-                    analysis.price_category.value if analysis.price_category else None,
-                    analysis.value_score, analysis.deal_quality, analysis.target_audience,
-                    analysis.purchase_urgency, analysis.seasonal_relevance, analysis.recommendation,
-                    json.dumps(analysis.pros) if analysis.pros else None,
-                    json.dumps(analysis.cons) if analysis.cons else None,
-                    analysis.analysis_model, analysis.confidence_score,
-                    analysis.processed_at.isoformat(), datetime.now().isoformat()
-                ))
+                cursor.execute(
+                    self._INSERT_ANALYSIS_SQL,
+                    self._analysis_params(analysis, datetime.now().isoformat())
+                )
                 
                 conn.commit()
                 logger.debug(f"Saved analysis for offer: {analysis.offer_id}")
@@ -281,10 +305,30 @@ class DatabaseManager:
             logger.error(f"Error saving analysis for {analysis.offer_id}: {e}")
             return False
     
+    def save_analyses_batch(self, analyses: List[OfferAnalysis]) -> int:
+        """Save multiple analyses in a single transaction"""
+        if not analyses:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                now = datetime.now().isoformat()
+                conn.executemany(
+                    self._INSERT_ANALYSIS_SQL,
+                    [self._analysis_params(analysis, now) for analysis in analyses]
+                )
+                conn.commit()
+                logger.info(f"Batch saved {len(analyses)} analyses")
+                return len(analyses)
+                
+        except Exception as e:
+            logger.error(f"Error in batch analysis save: {e}")
+            return 0
+    
     def get_offer(self, offer_id: str) -> Optional[Offer]:
         """Get offer by ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -303,7 +347,7 @@ class DatabaseManager:
                    active_only: bool = True) -> List[Offer]:
         """Get offers with optional filtering"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -337,7 +381,7 @@ class DatabaseManager:
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -354,10 +398,72 @@ class DatabaseManager:
             logger.error(f"Error getting recent offers: {e}")
             return []
     
+    def get_top_new_offers(self, hours: int = 1, limit: int = 25) -> List[Offer]:
+        """Get the best-scored offers created in the last N hours
+        
+        Offers are ranked by the value score of their latest analysis;
+        unanalyzed offers come last, newest first.
+        """
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT o.* FROM offers o
+                    LEFT JOIN offer_analyses a ON a.offer_id = o.id
+                      AND a.processed_at = (
+                          SELECT MAX(processed_at) FROM offer_analyses
+                          WHERE offer_id = o.id
+                      )
+                    WHERE o.created_at >= ? AND o.is_active = 1
+                    ORDER BY a.value_score IS NULL, a.value_score DESC, o.created_at DESC
+                    LIMIT ?
+                ''', (cutoff_time.isoformat(), limit))
+                
+                rows = cursor.fetchall()
+                return [self._row_to_offer(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Error getting top new offers: {e}")
+            return []
+    
+    def get_recent_excellent_offers(self, hours: int = 1) -> List[tuple]:
+        """Get (offer, analysis) pairs for recent offers whose latest analysis is excellent"""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                # o.* comes first so the shared id/created_at columns resolve
+                # to the offer
+                cursor.execute('''
+                    SELECT o.*, a.* FROM offers o
+                    JOIN offer_analyses a ON a.offer_id = o.id
+                    WHERE o.created_at >= ? AND o.is_active = 1
+                      AND a.price_category = ?
+                      AND a.processed_at = (
+                          SELECT MAX(processed_at) FROM offer_analyses
+                          WHERE offer_id = o.id
+                      )
+                    ORDER BY o.created_at DESC
+                ''', (cutoff_time.isoformat(), PriceCategory.EXCELLENT.value))
+                
+                rows = cursor.fetchall()
+                return [(self._row_to_offer(row), self._row_to_analysis(row)) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Error getting recent excellent offers: {e}")
+            return []
+    
     def get_offer_analysis(self, offer_id: str) -> Optional[OfferAnalysis]:
         """Get latest analysis for an offer"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -377,12 +483,63 @@ class DatabaseManager:
             logger.error(f"Error getting analysis for {offer_id}: {e}")
             return None
     
+    def existing_offer_ids(self, offer_ids: List[str]) -> set:
+        """Return the subset of offer_ids already stored"""
+        existing = set()
+        if not offer_ids:
+            return existing
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                
+                for start in range(0, len(offer_ids), self._MAX_QUERY_PARAMS):
+                    chunk = offer_ids[start:start + self._MAX_QUERY_PARAMS]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(f'SELECT id FROM offers WHERE id IN ({placeholders})', chunk)
+                    existing.update(row[0] for row in cursor.fetchall())
+                
+        except Exception as e:
+            logger.error(f"Error checking existing offers: {e}")
+        
+        return existing
+    
+    def get_analyses_for_offers(self, offer_ids: List[str]) -> Dict[str, OfferAnalysis]:
+        """Get latest analysis for each of the given offers in bulk"""
+        analyses = {}
+        if not offer_ids:
+            return analyses
+        
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                # Stay below SQLite's default host parameter limit
+                for start in range(0, len(offer_ids), self._MAX_QUERY_PARAMS):
+                    chunk = offer_ids[start:start + self._MAX_QUERY_PARAMS]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(f'''
+                        SELECT * FROM offer_analyses 
+                        WHERE offer_id IN ({placeholders})
+                        ORDER BY processed_at ASC
+                    ''', chunk)
+                    
+                    # Later rows overwrite earlier ones, keeping the latest
+                    for row in cursor.fetchall():
+                        analyses[row['offer_id']] = self._row_to_analysis(row)
+                
+        except Exception as e:
+            logger.error(f"Error getting analyses for {len(offer_ids)} offers: {e}")
+        
+        return analyses
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
         stats = {}
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Offer counts
@@ -430,7 +587,7 @@ class DatabaseManager:
         removed_count = 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Remove old analyses first (FK constraint)
@@ -7,7 +7,10 @@ Intelligent Swedish retail deal notifications
 """
 
 import asyncio
+import functools
 import logging
+import threading
+from itertools import groupby
 from typing import List, Optional
 import json
 from datetime import datetime
@@ -26,6 +29,23 @@ from .models import Offer, OfferAnalysis, NotificationMessage, PriceCategory
 
 logger = logging.getLogger(__name__)
 
+# Quality indicator per price category, built once instead of per message
+_QUALITY_ICONS = {
+    PriceCategory.EXCELLENT: "⭐⭐⭐",
+    PriceCategory.GOOD: "⭐⭐",
+    PriceCategory.AVERAGE: "⭐",
+    PriceCategory.POOR: "⚠️",
+}
+
+
+def _batch_tier(analysis: Optional[OfferAnalysis]) -> int:
+    """Batch section for an offer: 0 premium, 1 good, 2 other"""
+    if analysis and analysis.price_category == PriceCategory.EXCELLENT:
+        return 0
+    if analysis and analysis.value_score and analysis.value_score >= 7:
+        return 1
+    return 2
+
 
 class TelegramNotifier:
     """Telegram bot for sending Swedish deal notifications"""
@@ -34,12 +54,20 @@ class TelegramNotifier:
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.bot = None
+        self._send = None
         
         if telegram is None:
             logger.warning("Telegram library not available - notifications disabled")
             self.enabled = False
         else:
             self.bot = Bot(token=bot_token)
+            # Chat and parse mode never change per instance, bind them once
+            self._send = functools.partial(
+                self.bot.send_message,
+                chat_id=chat_id,
+                parse_mode=ParseMode.MARKDOWN,
+                disable_web_page_preview=True
+            )
             self.enabled = True
     
     async def initialize(self) -> bool:
@@ -65,12 +93,7 @@ class TelegramNotifier:
         try:
             message = self._create_offer_message(offer, analysis)
             
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message.content,
-                parse_mode=ParseMode.MARKDOWN,
-                disable_web_page_preview=False
-            )
+            await self._send(text=message.content, disable_web_page_preview=False)
             
             logger.info(f"Sent offer notification: {offer.name}")
             return True
@@ -79,8 +102,52 @@ class TelegramNotifier:
             logger.error(f"Failed to send offer notification: {e}")
             return False
     
-    async def send_batch_notification(self, offers: List[Offer], analyses: List[OfferAnalysis] = None) -> bool:
-        """Send notification for multiple offers"""
+    async def send_offer_notifications(self, offers_with_analysis: List[tuple],
+                                       merge_limit: int = 5, min_interval: float = 1.0) -> int:
+        """Send one notification per (offer, analysis) pair
+        
+        Up to ``merge_limit`` offers are merged into a single message; larger
+        sets are sent one at a time, at least ``min_interval`` seconds apart,
+        since all of them go to the same chat and Telegram allows about one
+        message per second per chat. Returns the number of offers delivered.
+        """
+        if not self.enabled or not offers_with_analysis:
+            return 0
+        
+        if len(offers_with_analysis) <= merge_limit:
+            try:
+                message = "\n\n".join(
+                    self._create_offer_message(offer, analysis).content
+                    for offer, analysis in offers_with_analysis
+                )
+                await self._send_long_message(message)
+                logger.info(f"Sent merged notification for {len(offers_with_analysis)} offers")
+                return len(offers_with_analysis)
+            except Exception as e:
+                logger.error(f"Failed to send merged offer notification: {e}")
+                return 0
+        
+        loop = asyncio.get_running_loop()
+        sent = 0
+        last_send = None
+        for offer, analysis in offers_with_analysis:
+            # Pace sends start-to-start so a slow request doesn't add extra delay
+            if last_send is not None:
+                wait = min_interval - (loop.time() - last_send)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            last_send = loop.time()
+            if await self.send_offer_notification(offer, analysis):
+                sent += 1
+        return sent
+    
+    async def send_batch_notification(self, offers: List[Offer], analyses: List[OfferAnalysis] = None,
+                                      max_other: int = 50) -> bool:
+        """Send notification for multiple offers
+        
+        Only the first ``max_other`` uncategorized offers are kept; the rest
+        are just counted since large batches are reported as a total anyway.
+        """
         if not self.enabled:
             return False
         
@@ -89,47 +156,43 @@ class TelegramNotifier:
             return True
         
         try:
-            # Create analysis lookup
-            analysis_map = {}
-            if analyses:
-                analysis_map = {a.offer_id: a for a in analyses}
+            # Group offers by quality/category for better presentation.
+            # The sort is stable, so offers keep their order within a tier.
+            pairs = self._pair_offers_analyses(offers, analyses)
+            keys = [_batch_tier(analysis) for _, analysis in pairs]
+            order = sorted(range(len(pairs)), key=keys.__getitem__)
             
-            # Group offers by quality/category for better presentation
-            premium_offers = []
-            good_offers = []
-            other_offers = []
+            tiers = [[], [], []]
+            for tier, group in groupby(order, key=keys.__getitem__):
+                tiers[tier] = [pairs[i] for i in group]
             
-            for offer in offers:
-                analysis = analysis_map.get(offer.id)
-                if analysis and analysis.price_category == PriceCategory.EXCELLENT:
-                    premium_offers.append((offer, analysis))
-                elif analysis and analysis.value_score and analysis.value_score >= 7:
-                    good_offers.append((offer, analysis))
-                else:
-                    other_offers.append((offer, analysis))
+            premium_offers, good_offers, other_offers = tiers
+            extra_count = max(len(other_offers) - max_other, 0)
+            if extra_count:
+                other_offers = other_offers[:max_other]
             
-            # Send premium offers first
+            # Premium offers first, then good offers, then the rest
+            parts = []
             if premium_offers:
-                message = self._create_premium_batch_message(premium_offers)
-                await self._send_long_message(message)
+                parts.append(self._create_premium_batch_message(premium_offers))
             
-            # Send good offers
             if good_offers:
-                message = self._create_good_batch_message(good_offers)  
-                await self._send_long_message(message)
+                parts.append(self._create_good_batch_message(good_offers))
             
-            # Send summary for remaining offers
-            if other_offers and len(other_offers) <= 10:
-                message = self._create_summary_batch_message(other_offers)
-                await self._send_long_message(message)
-            elif other_offers:
+            other_count = len(other_offers) + extra_count
+            if other_offers and not extra_count and other_count <= 10:
+                parts.append(self._create_summary_batch_message(other_offers))
+            elif other_count:
                 # Just send count for large batches
-                count_msg = f"📊 Plus {len(other_offers)} additional offers available"
-                await self.bot.send_message(
-                    chat_id=self.chat_id,
-                    text=count_msg,
-                    parse_mode=ParseMode.MARKDOWN
-                )
+                parts.append(f"📊 Plus {other_count} additional offers available")
+            
+            # One API call when everything fits, otherwise one message per section
+            combined = "\n\n".join(parts)
+            if len(combined) <= 4000:
+                await self._send_long_message(combined)
+            else:
+                for part in parts:
+                    await self._send_long_message(part)
             
             logger.info(f"Sent batch notification: {len(offers)} offers")
             return True
@@ -138,6 +201,26 @@ class TelegramNotifier:
             logger.error(f"Failed to send batch notification: {e}")
             return False
     
+    @staticmethod
+    def _pair_offers_analyses(offers: List[Offer], analyses: Optional[List[OfferAnalysis]]):
+        """Pair each offer with its analysis (or None)
+        
+        The pipeline usually passes analyses in the same order as offers, so
+        aligned lists are zipped directly; the id lookup map is only built
+        when the lists are misaligned.
+        """
+        if not analyses:
+            return [(offer, None) for offer in offers]
+        
+        if len(analyses) == len(offers) and all(
+            a.offer_id == o.id for o, a in zip(offers, analyses)
+        ):
+            return list(zip(offers, analyses))
+        
+        analysis_map = {a.offer_id: a for a in analyses}
+        get = analysis_map.get
+        return [(offer, get(offer.id)) for offer in offers]
+    
     async def send_summary(self, summary_text: str, offer_count: int = 0) -> bool:
         """Send intelligent summary message"""
         if not self.enabled:
@@ -171,11 +254,7 @@ class TelegramNotifier:
             
             message = f"{icon} *Locopon System Status*\n`{timestamp}` - {status_message}"
             
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=ParseMode.MARKDOWN
-            )
+            await self._send(text=message)
             
             return True
             
@@ -209,15 +288,8 @@ class TelegramNotifier:
             lines.append("")  # Separator
             
             # Quality indicator
-            quality_icons = {
-                PriceCategory.EXCELLENT: "⭐⭐⭐",
-                PriceCategory.GOOD: "⭐⭐", 
-                PriceCategory.AVERAGE: "⭐",
-                PriceCategory.POOR: "⚠️"
-            }
-            
             if analysis.price_category:
-                icon = quality_icons.get(analysis.price_category, "")
+                icon = _QUALITY_ICONS.get(analysis.price_category, "")
                 lines.append(f"{icon} {analysis.price_category.value.title()} Deal")
             
             if analysis.value_score:
@@ -244,65 +316,63 @@ class TelegramNotifier:
     
     def _create_premium_batch_message(self, offers_with_analysis: List[tuple]) -> str:
         """Create message for premium/excellent offers"""
-        lines = ["⭐⭐⭐ *PREMIUM DEALS* ⭐⭐⭐\n"]
-        
-        for offer, analysis in offers_with_analysis[:5]:  # Limit to top 5
-            lines.append(f"🔥 *{offer.name}*")
-            lines.append(f"   💰 {offer.get_display_price()} at {offer.business_name}")
-            
-            if analysis and analysis.value_score:
-                lines.append(f"   📈 Score: {analysis.value_score}/10")
-            
-            if analysis and analysis.recommendation:
-                lines.append(f"   💡 {analysis.recommendation}")
+        def render():
+            yield "⭐⭐⭐ *PREMIUM DEALS* ⭐⭐⭐\n"
             
-            if offer.url:
-                lines.append(f"   [View Deal]({offer.url})")
-            
-            lines.append("")  # Separator
+            for offer, analysis in offers_with_analysis[:5]:  # Limit to top 5
+                yield f"🔥 *{offer.name}*"
+                yield f"   💰 {offer.get_display_price()} at {offer.business_name}"
+                
+                if analysis and analysis.value_score:
+                    yield f"   📈 Score: {analysis.value_score}/10"
+                
+                if analysis and analysis.recommendation:
+                    yield f"   💡 {analysis.recommendation}"
+                
+                if offer.url:
+                    yield f"   [View Deal]({offer.url})"
+                
+                yield ""  # Separator
         
-        return "\n".join(lines)
+        return "\n".join(render())
     
     def _create_good_batch_message(self, offers_with_analysis: List[tuple]) -> str:
         """Create message for good quality offers"""
-        lines = ["⭐⭐ *GOOD DEALS* ⭐⭐\n"]
-        
-        for offer, analysis in offers_with_analysis[:8]:  # Limit to top 8
-            lines.append(f"✅ *{offer.name}*")
-            lines.append(f"   💰 {offer.get_display_price()} at {offer.business_name}")
-            
-            if analysis and analysis.category:
-                lines.append(f"   🏷️ {analysis.category}")
+        def render():
+            yield "⭐⭐ *GOOD DEALS* ⭐⭐\n"
             
-            if offer.url:
-                lines.append(f"   [View]({offer.url})")
-            
-            lines.append("")
+            for offer, analysis in offers_with_analysis[:8]:  # Limit to top 8
+                yield f"✅ *{offer.name}*"
+                yield f"   💰 {offer.get_display_price()} at {offer.business_name}"
+                
+                if analysis and analysis.category:
+                    yield f"   🏷️ {analysis.category}"
+                
+                if offer.url:
+                    yield f"   [View]({offer.url})"
+                
+                yield ""
         
-        return "\n".join(lines)
+        return "\n".join(render())
     
     def _create_summary_batch_message(self, offers_with_analysis: List[tuple]) -> str:
         """Create summary message for remaining offers"""
-        lines = ["📊 *OTHER OFFERS*\n"]
-        
-        for offer, analysis in offers_with_analysis:
-            price_emoji = "💰"
-            if analysis and analysis.price_category == PriceCategory.POOR:
-                price_emoji = "⚠️"
+        def render():
+            yield "📊 *OTHER OFFERS*\n"
             
-            lines.append(f"{price_emoji} {offer.name} - {offer.get_display_price()}")
+            for offer, analysis in offers_with_analysis:
+                price_emoji = "💰"
+                if analysis and analysis.price_category == PriceCategory.POOR:
+                    price_emoji = "⚠️"
+                
+                yield f"{price_emoji} {offer.name} - {offer.get_display_price()}"
         
-        return "\n".join(lines)
+        return "\n".join(render())
     
     async def _send_long_message(self, message: str, max_length: int = 4000):
         """Send message, splitting if too long"""
         if len(message) <= max_length:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=ParseMode.MARKDOWN,
-                disable_web_page_preview=True
-            )
+            await self._send(text=message)
         else:
             # Split message into chunks
             chunks = self._split_message(message, max_length)
@@ -310,12 +380,7 @@ class TelegramNotifier:
                 if i > 0:
                     await asyncio.sleep(0.5)  # Small delay between messages
                 
-                await self.bot.send_message(
-                    chat_id=self.chat_id,
-                    text=chunk,
-                    parse_mode=ParseMode.MARKDOWN,
-                    disable_web_page_preview=True
-                )
+                await self._send(text=chunk)
     
     def _split_message(self, message: str, max_length: int) -> List[str]:
         """Split long message into chunks"""
@@ -363,37 +428,66 @@ class TelegramNotifierSync:
     def __init__(self, bot_token: str, chat_id: str):
         self.notifier = TelegramNotifier(bot_token, chat_id)
         self.loop = None
+        self._loop_lock = threading.Lock()
     
     def _get_loop(self):
-        """Get or create event loop"""
-        try:
-            return asyncio.get_event_loop()
-        except RuntimeError:
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
+        """Start, once, the event loop every notifier call runs on
+        
+        The bot's HTTP client is bound to the loop it was initialized on, and
+        the scheduler calls in from several job threads at once, so all
+        coroutines are handed to this one loop running on its own thread.
+        """
+        with self._loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self.loop.run_forever,
+                    name='locopon-notifier',
+                    daemon=True
+                ).start()
             return self.loop
     
+    def _run(self, coro):
+        """Run a notifier coroutine on the notifier loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+    
+    def health_check(self) -> bool:
+        """Test Telegram bot connectivity"""
+        return self.notifier.health_check()
+    
     def initialize(self) -> bool:
         """Initialize bot connection"""
-        loop = self._get_loop()
-        return loop.run_until_complete(self.notifier.initialize())
+        if not self.notifier.enabled:
+            return False
+        return self._run(self.notifier.initialize())
     
     def send_offer_notification(self, offer: Offer, analysis: Optional[OfferAnalysis] = None) -> bool:
         """Send single offer notification"""
-        loop = self._get_loop()
-        return loop.run_until_complete(self.notifier.send_offer_notification(offer, analysis))
+        if not self.notifier.enabled:
+            return False
+        return self._run(self.notifier.send_offer_notification(offer, analysis))
+    
+    def send_offer_notifications_bulk(self, offers_with_analysis: List[tuple]) -> int:
+        """Send notifications for several (offer, analysis) pairs"""
+        if not self.notifier.enabled:
+            return 0
+        return self._run(self.notifier.send_offer_notifications(offers_with_analysis))
     
-    def send_batch_notification(self, offers: List[Offer], analyses: List[OfferAnalysis] = None) -> bool:
+    def send_batch_notification(self, offers: List[Offer], analyses: List[OfferAnalysis] = None,
+                                max_other: int = 50) -> bool:
         """Send batch notification"""
-        loop = self._get_loop()
-        return loop.run_until_complete(self.notifier.send_batch_notification(offers, analyses))
+        if not self.notifier.enabled:
+            return False
+        return self._run(self.notifier.send_batch_notification(offers, analyses, max_other))
     
     def send_summary(self, summary_text: str, offer_count: int = 0) -> bool:
         """Send summary"""
-        loop = self._get_loop()
-        return loop.run_until_complete(self.notifier.send_summary(summary_text, offer_count))
+        if not self.notifier.enabled:
+            return False
+        return self._run(self.notifier.send_summary(summary_text, offer_count))
     
     def send_system_status(self, status_message: str, is_error: bool = False) -> bool:
         """Send system status"""
-        loop = self._get_loop()
-        return loop.run_until_complete(self.notifier.send_system_status(status_message, is_error))
+        if not self.notifier.enabled:
+            return False
+        return self._run(self.notifier.send_system_status(status_message, is_error))
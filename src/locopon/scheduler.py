@@ -7,11 +7,12 @@ Automated scheduling and monitoring for Swedish retail deals discovery
 """
 
 import time
+import asyncio
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Dict, Any, Callable
 from datetime import datetime, timedelta
-import schedule
 
 from .scraper import EreklamkladScraper
 from .analyzer import DeepSeekAnalyzer
@@ -21,6 +22,33 @@ from .models import SystemStatus
 
 logger = logging.getLogger(__name__)
 
+# Popular publications used when none are configured
+DEFAULT_PUBLICATIONS = (
+    "https://ereklamblad.se/ICA-Maxi-Stormarknad?publication=5X0fxUgs",
+    "https://ereklamblad.se/Coop?publication=4zFUKNKp",
+    "https://ereklamblad.se/Willys?publication=JlTbj6jx",
+)
+
+
+def _every(interval: timedelta) -> Callable[[datetime], datetime]:
+    """Next-run function for a fixed interval"""
+    return lambda after: after + interval
+
+
+def _daily_at(at_time: str, weekday: Optional[int] = None) -> Callable[[datetime], datetime]:
+    """Next-run function for a HH:MM time, optionally on one weekday (Monday=0)"""
+    hour, minute = (int(part) for part in at_time.split(':'))
+    
+    def next_run(after: datetime) -> datetime:
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is not None:
+            candidate += timedelta(days=(weekday - candidate.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=1 if weekday is None else 7)
+        return candidate
+    
+    return next_run
+
 
 class LocoponScheduler:
     """Main scheduler for automated deal discovery and analysis"""
@@ -29,6 +57,11 @@ class LocoponScheduler:
         self.config = config
         self.running = False
         self.scheduler_thread = None
+        self._loop = None
+        self._job_executor = None
+        self._job_tasks = set()
+        self._stats_cache = (0.0, None)  # (monotonic timestamp, stats)
+        self._known_offer_ids = set()
         
         # Initialize components
         self.db = DatabaseManager(config.get('database_path', 'data/locopon.db'))
@@ -53,29 +86,38 @@ class LocoponScheduler:
         # Scheduling configuration
         self.schedule_config = config.get('schedule', {})
         self.setup_default_schedules()
+        
+        # Resolve per-run settings once instead of on every job
+        self._target_publications = tuple(config.get('target_publications') or DEFAULT_PUBLICATIONS)
+        self._max_analysis_per_run = int(config.get('max_analysis_per_run', 20))
+        self._cleanup_days = int(config.get('cleanup_days', 30))
+        self._db_size_limit_mb = config.get('db_size_limit_mb', 1000)
+        self._notify_top_k = int(config.get('notify_top_k', 25))
     
     def setup_default_schedules(self):
         """Setup default scheduled tasks"""
+        self._job_specs = {}  # job name -> (callable, next-run function)
+        self._next_run_by_name = {}
         
         # Main scraping schedule - default every 2 hours
         scrape_interval = self.schedule_config.get('scrape_interval_hours', 2)
-        schedule.every(scrape_interval).hours.do(self._run_full_discovery)
+        self._add_job(self._run_full_discovery, _every(timedelta(hours=scrape_interval)))
         
         # Quick check schedule - default every 30 minutes for urgent deals
         quick_interval = self.schedule_config.get('quick_check_minutes', 30)
-        schedule.every(quick_interval).minutes.do(self._run_quick_check)
+        self._add_job(self._run_quick_check, _every(timedelta(minutes=quick_interval)))
         
         # Daily summary - default at 20:00
         summary_time = self.schedule_config.get('daily_summary_time', '20:00')
-        schedule.every().day.at(summary_time).do(self._send_daily_summary)
+        self._add_job(self._send_daily_summary, _daily_at(summary_time))
         
         # Weekly cleanup - default Sunday at 02:00  
         cleanup_time = self.schedule_config.get('cleanup_time', '02:00')
-        schedule.every().sunday.at(cleanup_time).do(self._run_cleanup)
+        self._add_job(self._run_cleanup, _daily_at(cleanup_time, weekday=6))
         
         # Health check - default every hour
         health_interval = self.schedule_config.get('health_check_minutes', 60)
-        schedule.every(health_interval).minutes.do(self._run_health_check)
+        self._add_job(self._run_health_check, _every(timedelta(minutes=health_interval)))
         
         logger.info("Scheduled tasks configured:")
         logger.info(f"  - Full discovery: every {scrape_interval} hours")
@@ -96,7 +138,13 @@ class LocoponScheduler:
         # Initialize components
         self._initialize_components()
         
-        # Start scheduler thread
+        # Start the event loop thread; jobs run on a pool so a long discovery
+        # cycle doesn't hold up the quick checks or health checks
+        self._loop = asyncio.new_event_loop()
+        self._job_executor = ThreadPoolExecutor(
+            max_workers=len(self._job_specs),
+            thread_name_prefix='locopon-job'
+        )
         self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
         self.scheduler_thread.start()
         
@@ -114,11 +162,15 @@ class LocoponScheduler:
         
         logger.info("Stopping Locopon scheduler")
         self.running = False
+        self._loop.call_soon_threadsafe(self._loop.stop)
         
         # Wait for scheduler thread to finish
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
         
+        # Jobs already running finish in the background
+        self._job_executor.shutdown(wait=False)
+        
         # Send shutdown notification
         if self.notifier:
             self.notifier.send_system_status("Locopon scheduler stopped")
@@ -136,7 +188,7 @@ class LocoponScheduler:
         
         # Test database
         try:
-            stats = self.db.get_statistics()
+            stats = self._cached_stats()
             logger.info(f"Database connected: {stats['total_offers']} offers, {stats['total_analyses']} analyses")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
@@ -164,37 +216,68 @@ class LocoponScheduler:
         
         return True
     
+    def _add_job(self, job_func: Callable, next_run_after: Callable[[datetime], datetime]):
+        """Register a job and work out its first run"""
+        name = job_func.__name__
+        self._job_specs[name] = (job_func, next_run_after)
+        self._next_run_by_name[name] = next_run_after(datetime.now())
+    
+    def _schedule_job(self, name: str, next_run: datetime):
+        """Arm the event loop timer for a job's next run"""
+        self._next_run_by_name[name] = next_run
+        delay = max(0.0, (next_run - datetime.now()).total_seconds())
+        self._loop.call_later(delay, self._start_job, name)
+    
+    def _start_job(self, name: str):
+        """Timer callback: launch a job as a task on the loop"""
+        if not self.running:
+            return
+        task = self._loop.create_task(self._run_job(name))
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+    
+    async def _run_job(self, name: str):
+        """Run a blocking job on the job pool, then schedule its next run"""
+        job_func, next_run_after = self._job_specs[name]
+        try:
+            await self._loop.run_in_executor(self._job_executor, job_func)
+        except Exception as e:
+            logger.error(f"Error in scheduled job {name}: {e}")
+        finally:
+            # Intervals count from job completion, as with the schedule library
+            if self.running:
+                self._schedule_job(name, next_run_after(datetime.now()))
+    
     def _scheduler_loop(self):
         """Main scheduler loop"""
         logger.info("Scheduler loop started")
+        asyncio.set_event_loop(self._loop)
         
-        while self.running:
-            try:
-                schedule.run_pending()
-                time.sleep(30)  # Check every 30 seconds
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {e}")
-                time.sleep(60)  # Wait longer on error
+        for name, next_run in list(self._next_run_by_name.items()):
+            self._schedule_job(name, next_run)
+        
+        try:
+            self._loop.run_forever()
+        finally:
+            # Drop our handle on jobs still in flight; their threads finish
+            # on their own
+            for task in list(self._job_tasks):
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*self._job_tasks, return_exceptions=True)
+            )
+            self._loop.close()
         
         logger.info("Scheduler loop stopped")
     
     def _run_full_discovery(self) -> bool:
         """Run full offer discovery and analysis"""
-        start_time = datetime.now()
+        start_time = time.monotonic()
         logger.info("Starting full discovery cycle")
         
         try:
             # Scrape new offers
-            logger.info("Discovering new offers...")
-            publications = self.config.get('target_publications', [])
-            
-            if not publications:
-                # Use default popular publications
-                publications = [
-                    "https://ereklamblad.se/ICA-Maxi-Stormarknad?publication=5X0fxUgs",
-                    "https://ereklamblad.se/Coop?publication=4zFUKNKp", 
-                    "https://ereklamblad.se/Willys?publication=JlTbj6jx"
-                ]
+            logger.info(f"Discovering new offers from {len(self._target_publications)} publications...")
             
             all_offers = []
             
@@ -204,17 +287,43 @@ class LocoponScheduler:
                 offer_ids = self.scraper.discover_offers(max_attempts=50)
                 
                 if offer_ids:
-                    logger.info(f"Found {len(offer_ids)} offer IDs, extracting data...")
+                    # Skip offers already stored; ids seen in earlier cycles
+                    # are known without asking the database again
+                    unseen_ids = [i for i in offer_ids if i not in self._known_offer_ids]
+                    self._known_offer_ids.update(self.db.existing_offer_ids(unseen_ids))
+                    known_count = len(offer_ids)
+                    offer_ids = [i for i in unseen_ids if i not in self._known_offer_ids]
+                    known_count -= len(offer_ids)
+                    
+                    if not offer_ids:
+                        duration = time.monotonic() - start_time
+                        status_message = f"Discovery completed: no new offers, all {known_count} discovered offers already stored (took {duration:.1f}s)"
+                        logger.info(status_message)
+                        
+                        if self.notifier:
+                            self.notifier.send_system_status(status_message)
+                        
+                        return True
+                    
+                    logger.info(f"Found {len(offer_ids)} new offer IDs ({known_count} already stored), extracting data...")
                     
-                    # Extract data for each offer ID
-                    for offer_id in offer_ids:
-                        try:
-                            offer_data = self.scraper.extract_offer_data(offer_id)
-                            if offer_data:
-                                all_offers.append(offer_data)
-                                logger.debug(f"Extracted data for offer: {offer_id}")
-                        except Exception as e:
-                            logger.warning(f"Failed to extract data for offer {offer_id}: {e}")
+                    # Extract data for each offer ID; requests are I/O bound so
+                    # run them on a small thread pool sharing the scraper session
+                    max_workers = self.config.get('scrape_workers', 8)
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        futures = {
+                            executor.submit(self.scraper.extract_offer_data, offer_id): offer_id
+                            for offer_id in offer_ids
+                        }
+                        for future in as_completed(futures):
+                            offer_id = futures[future]
+                            try:
+                                offer_data = future.result()
+                                if offer_data:
+                                    all_offers.append(offer_data)
+                                    logger.debug(f"Extracted data for offer: {offer_id}")
+                            except Exception as e:
+                                logger.warning(f"Failed to extract data for offer {offer_id}: {e}")
                     
                     logger.info(f"Successfully extracted {len(all_offers)} complete offers")
                 else:
@@ -231,6 +340,7 @@ class LocoponScheduler:
             # Save offers to database
             logger.info(f"Saving {len(all_offers)} offers to database")
             saved_count = self.db.save_offers_batch(all_offers)
+            self._known_offer_ids.update(offer.id for offer in all_offers)
             
             # Filter new offers (created in last hour)
             new_offers = self.db.get_recent_offers(hours=1)
@@ -242,14 +352,16 @@ class LocoponScheduler:
                 logger.info("Starting AI analysis of new offers")
                 
                 # Limit analysis to prevent API overuse
-                max_analysis = self.config.get('max_analysis_per_run', 20)
-                offers_to_analyze = new_offers[:max_analysis]
+                offers_to_analyze = new_offers[:self._max_analysis_per_run]
                 
-                analyses = self.analyzer.analyze_batch(offers_to_analyze)
+                # Requests are independent, so issue them concurrently
+                analyses = asyncio.run(self.analyzer.analyze_batch_async(
+                    offers_to_analyze,
+                    concurrency=self.config.get('analysis_concurrency', 8)
+                ))
                 
                 # Save analyses
-                for analysis in analyses:
-                    self.db.save_analysis(analysis)
+                self.db.save_analyses_batch(analyses)
                 
                 logger.info(f"Completed {len(analyses)} AI analyses")
             
@@ -257,8 +369,9 @@ class LocoponScheduler:
             if self.notifier and new_offers:
                 logger.info("Sending notifications")
                 
-                # Send batch notification for new offers
-                self.notifier.send_batch_notification(new_offers, analyses)
+                # Only the best-scored offers go into the batch message
+                top_offers = self.db.get_top_new_offers(hours=1, limit=self._notify_top_k)
+                self.notifier.send_batch_notification(top_offers, analyses)
                 
                 # Generate and send summary if we have analyses
                 if analyses and self.analyzer:
@@ -266,8 +379,8 @@ class LocoponScheduler:
                     self.notifier.send_summary(summary, len(new_offers))
             
             # Update system status
-            duration = datetime.now() - start_time
-            status_message = f"Discovery completed: {len(all_offers)} total offers, {len(new_offers)} new, {len(analyses)} analyzed (took {duration.total_seconds():.1f}s)"
+            duration = time.monotonic() - start_time
+            status_message = f"Discovery completed: {len(all_offers)} total offers, {len(new_offers)} new, {len(analyses)} analyzed (took {duration:.1f}s)"
             
             logger.info(status_message)
             
@@ -290,28 +403,15 @@ class LocoponScheduler:
         logger.debug("Running quick check")
         
         try:
-            # Quick check for excellent deals only
-            recent_offers = self.db.get_recent_offers(hours=1)
-            
-            if not recent_offers:
-                return True
-            
-            # If analyzer available, check for excellent deals
+            # Quick check for excellent deals only, if analyzer available
             if self.analyzer:
-                urgent_offers = []
-                
-                for offer in recent_offers:
-                    analysis = self.db.get_offer_analysis(offer.id)
-                    if analysis and analysis.price_category and analysis.price_category.value == 'excellent':
-                        urgent_offers.append(offer)
+                urgent_offers = self.db.get_recent_excellent_offers(hours=1)
                 
                 # Send urgent notifications
                 if urgent_offers and self.notifier:
-                    for offer in urgent_offers:
-                        analysis = self.db.get_offer_analysis(offer.id)
-                        self.notifier.send_offer_notification(offer, analysis)
+                    sent = self.notifier.send_offer_notifications_bulk(urgent_offers)
                     
-                    logger.info(f"Sent {len(urgent_offers)} urgent deal notifications")
+                    logger.info(f"Sent {sent}/{len(urgent_offers)} urgent deal notifications")
             
             return True
             
@@ -333,11 +433,8 @@ class LocoponScheduler:
                 return True
             
             # Get analyses for today's offers
-            analyses = []
-            for offer in today_offers:
-                analysis = self.db.get_offer_analysis(offer.id)
-                if analysis:
-                    analyses.append(analysis)
+            analysis_map = self.db.get_analyses_for_offers([offer.id for offer in today_offers])
+            analyses = [analysis_map[offer.id] for offer in today_offers if offer.id in analysis_map]
             
             # Generate intelligent summary
             if self.analyzer and analyses:
@@ -362,11 +459,14 @@ class LocoponScheduler:
         
         try:
             # Clean old data
-            cleanup_days = self.config.get('cleanup_days', 30)
-            removed_count = self.db.cleanup_old_data(cleanup_days)
+            removed_count = self.db.cleanup_old_data(self._cleanup_days)
+            
+            # Removed offers may be rediscovered, so forget what we knew
+            self._known_offer_ids.clear()
             
             # Get updated statistics
-            stats = self.db.get_statistics()
+            self._stats_cache = (0.0, None)
+            stats = self._cached_stats()
             
             cleanup_message = f"Weekly cleanup completed: {removed_count} old records removed. Database now has {stats['active_offers']} active offers ({stats['db_size_mb']:.1f}MB)"
             
@@ -392,18 +492,30 @@ class LocoponScheduler:
         
         issues = []
         
+        # The probes are independent network/disk calls, so run them side by
+        # side; don't wait on the pool at exit so a hung probe can't block us
+        executor = ThreadPoolExecutor(max_workers=3)
         try:
+            db_future = executor.submit(self._cached_stats)
+            ai_future = executor.submit(self.analyzer.health_check) if self.analyzer else None
+            tg_future = executor.submit(self.notifier.health_check) if self.notifier else None
+            
             # Check database
-            stats = self.db.get_statistics()
-            if stats['db_size_mb'] > 1000:  # 1GB limit
-                issues.append("Database size exceeds 1GB")
+            try:
+                stats = db_future.result(timeout=10)
+            except Exception as e:
+                logger.warning(f"Database probe failed: {e!r}")
+                issues.append("Database unavailable")
+            else:
+                if stats['db_size_mb'] > self._db_size_limit_mb:
+                    issues.append(f"Database size exceeds {self._db_size_limit_mb}MB")
             
             # Check AI analyzer
-            if self.analyzer and not self.analyzer.health_check():
+            if ai_future and not self._probe_passed(ai_future):
                 issues.append("DeepSeek AI analyzer unavailable")
             
             # Check Telegram notifier
-            if self.notifier and not self.notifier.health_check():
+            if tg_future and not self._probe_passed(tg_future):
                 issues.append("Telegram notifier unavailable")
             
             # Report issues if any
@@ -423,6 +535,17 @@ class LocoponScheduler:
             error_message = f"Health check failed: {e}"
             logger.error(error_message)
             return False
+        
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _probe_passed(self, future, timeout: float = 10) -> bool:
+        """Wait for a health probe, treating errors and timeouts as failures"""
+        try:
+            return bool(future.result(timeout=timeout))
+        except Exception as e:
+            logger.warning(f"Health probe failed: {e!r}")
+            return False
     
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status"""
@@ -440,12 +563,19 @@ class LocoponScheduler:
                 'analyzer': self.analyzer is not None,
                 'notifier': self.notifier is not None,
             },
-            'database_stats': self.db.get_statistics() if self.db else {}
+            'database_stats': self._cached_stats() if self.db else {}
         }
     
+    def _cached_stats(self, ttl: float = 60) -> Dict[str, Any]:
+        """Get database statistics, reusing results younger than ttl seconds"""
+        fetched_at, stats = self._stats_cache
+        now = time.monotonic()
+        if stats is None or now - fetched_at >= ttl:
+            stats = self.db.get_statistics()
+            self._stats_cache = (now, stats)
+        return stats
+    
     def _get_next_run_time(self, job_func_name: str) -> Optional[str]:
         """Get next run time for a scheduled job"""
-        for job in schedule.jobs:
-            if hasattr(job.job_func, '__name__') and job.job_func.__name__ == job_func_name:
-                return str(job.next_run)
-        return None
+        next_run = self._next_run_by_name.get(job_func_name)
+        return str(next_run) if next_run else None
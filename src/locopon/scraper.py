@@ -1,24 +1,146 @@
 #!/usr/bin/env python3  
 # -*- coding: utf-8 -*-
 
-import requests
 import json
 import logging
+import os
 import time
 import random
 import string
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from bs4 import BeautifulSoup
 
+from ._http import get_session
+
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
+# orjson decodes large embedded blobs several times faster; its JSONDecodeError
+# subclasses json.JSONDecodeError, so the existing handlers still apply
+try:
+    import orjson
+    _jloads = orjson.loads
+except ImportError:
+    _jloads = json.loads
+
+
+# Offer ID patterns for publication pages, compiled once
+_ID_PATTERNS = [
+    re.compile(r'"id"\s*:\s*"([a-zA-Z0-9_-]{10,})"'),
+    re.compile(r'"offerId"\s*:\s*"([a-zA-Z0-9_-]{10,})"'),
+    re.compile(r'"offer_id"\s*:\s*"([a-zA-Z0-9_-]{10,})"'),
+]
+# Direct offer ID references, fused into one alternation so the page is scanned once
+_OFFER_ID_RE = re.compile(
+    r'offer(?:Id)?["\']?\s*:\s*["\'](?P<key>[a-zA-Z0-9_-]{10,})["\']'
+    r'|id["\']?\s*:\s*["\'](?P<std>[a-zA-Z0-9_-]{17})["\']'  # Standard length
+    r'|/offer/(?P<path>[a-zA-Z0-9_-]{10,})'
+    r'|&offer=(?P<qs>[a-zA-Z0-9_-]{10,})',
+    re.IGNORECASE
+)
+# Offer arrays whose captured body holds quoted IDs
+_OFFER_ARRAY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+        r'offers?\s*:\s*\[(.*?)\]',
+        r'publication.*?offers?\s*:\s*\[(.*?)\]',
+        r'window\.__INITIAL_STATE__.*?"offers":\[(.*?)\]',
+    )
+]
+_QUOTED_ID_RE = re.compile(r'["\']([a-zA-Z0-9_-]{10,})["\']')
+_HREF_OFFER_RE = re.compile(r'offer=([a-zA-Z0-9_-]+)')
+_VALID_ID_RE = re.compile(r'^[a-zA-Z0-9_-]{10,}$')
+
+# Offer page indicators for _test_offer_exists, scanned case-insensitively
+_NEG_RE = re.compile(r'not found|404|ingen erbjudande|\berror\b', re.IGNORECASE)
+_POS_RE = re.compile(r'offer|price|product', re.IGNORECASE)
+
+# Offer page fallbacks in _parse_offer_from_html and _extract_price
+_PRICE_RE = re.compile(
+    r'(?P<dec>\d+[,.]\d+)\s*kr'
+    r'|(?P<int>\d+)\s*kr'
+    r'|(?:price|pris)["\']?\s*:\s*["\']?(?P<json>\d+(?:[,.]?\d+)?)',
+    re.IGNORECASE
+)
+_DATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'gäller.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'till.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'valid.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+    )
+]
+_CATEGORY_SELECTOR = '.category, .breadcrumb, [data-category], .product-category, .offer-category'
+_TITLE_CLEAN_ICA = re.compile(r'\s*-\s*ICA.*$')
+_TITLE_CLEAN_EREK = re.compile(r'\s*\|\s*eReklamblad.*$')
+
+
+class _PriceCharTable(dict):
+    """str.translate table keeping only digits, commas and dots; other code points map to None"""
+    
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = codepoint if char in ',.' or char.isdecimal() else None
+        return self[codepoint]
+
+
+_PRICE_CHARS = _PriceCharTable()
+
+# JSON keys that can hold each offer field, in order of preference
+_OFFER_FIELD_KEYS = {
+    'name': ('name', 'title', 'productName'),
+    'description': ('description', 'productDescription'),
+    'current_price': ('price', 'currentPrice', 'salePrice'),
+    'original_price': ('originalPrice', 'regularPrice'),
+    'currency': ('currency', 'priceCurrency'),
+    'image_url': ('image', 'imageUrl', 'thumbnail'),
+    'valid_until': ('validUntil', 'endDate', 'expiryDate'),
+    'category': ('category', 'productCategory'),
+    'business_name': ('retailer', 'store', 'businessName'),
+}
+_OFFER_FIELD_DEFAULTS = {'currency': 'SEK', 'business_name': 'ICA Maxi'}
+_PRICE_FIELDS = frozenset(('current_price', 'original_price'))
+
+# Character classes for ID mutation
+_ALPHA = string.ascii_letters
+_DIGIT = string.digits
+_SPECIAL = '_-'
+
+# Keys holding offer IDs in ereklamblad JSON (keys are known-case)
+_ID_KEYS = frozenset(('id', 'offerid', 'offer_id', 'offerId'))
+
+
+def _response_text(response):
+    """Decode a response body once, assuming UTF-8 instead of sniffing when no charset is declared"""
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    return response.text
+
+
+def _looks_like_offer(obj):
+    """Whether a JSON dict is an offer object rather than just something with an id"""
+    offer_id = obj.get('id')
+    return (isinstance(offer_id, str) and len(offer_id) >= 10
+            and ('price' in obj or 'name' in obj or 'image' in obj))
+
+
 class EreklamkladScraper:
     """Enhanced universal scraper supporting multiple retailers and publication types"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, max_workers=10):
+        # Concurrent page fetches; kept within the session's connection pool
+        self.max_workers = max_workers
+        
+        # Connections (with transport-level retries) come from the pool shared by all scrapers
+        self.session = get_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -56,6 +178,21 @@ class EreklamkladScraper:
         # Cache for weekly scraping
         self.last_scrape_date = {}  # Per retailer
         self.cached_offers = {}     # Per retailer
+        
+        # Existence verdicts per offer ID; mutation strategies often repeat IDs
+        self._exists_cache: Dict[str, bool] = {}
+        
+        # Offer objects embedded in publication pages:
+        # (retailer_slug, publication_id) -> {offer_id: offer_json}
+        self._publication_cache: Dict[tuple, Dict[str, dict]] = {}
+        
+        # Publication type per (retailer_slug, publication_id) -> (detected_at, type);
+        # layouts change at most weekly, like the offer cache
+        self._pub_type_cache: Dict[tuple, tuple] = {}
+        
+        # Parsed publication pages per (retailer_slug, publication_id), shared by
+        # type detection and extraction within one discovery pass
+        self._page_cache: Dict[tuple, BeautifulSoup] = {}
     
     def discover_offers(self, force_refresh=False, retailers=None):
         """Discover all offers from supported retailers - only scrape weekly unless forced"""
@@ -98,7 +235,8 @@ class EreklamkladScraper:
                 logger.warning(f"Unknown publication type for {retailer['name']}, trying individual offers mode")
                 retailer_offers = self._scrape_individual_offers(retailer_key)
             
-            # Cache results
+            # Cache results; the page itself is refetched on the next scrape
+            self._page_cache.pop((retailer['slug'], retailer['publication_id']), None)
             self.cached_offers[retailer_key] = retailer_offers
             self.last_scrape_date[retailer_key] = now
             
@@ -110,17 +248,27 @@ class EreklamkladScraper:
     
     def _detect_publication_type(self, retailer_slug, publication_id):
         """Detect whether a publication uses individual offers or catalog mode"""
+        key = (retailer_slug, publication_id)
+        now = datetime.now()
+        hit = self._pub_type_cache.get(key)
+        if hit and (now - hit[0]).days < 7:
+            return hit[1]
+        
+        pub_type = self._fetch_publication_type(retailer_slug, publication_id)
+        # Don't pin a failed detection for a week
+        if pub_type != "unknown":
+            self._pub_type_cache[key] = (now, pub_type)
+        return pub_type
+    
+    def _fetch_publication_type(self, retailer_slug, publication_id):
+        """Fetch the publication page and classify it from its app-data"""
         try:
-            url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
+            soup = self._get_publication_page(retailer_slug, publication_id)
+            if soup is None:
                 return "unknown"
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+            app_data_elements = soup.select('[id*="app-data"]')
             
-            individual_offers_found = False
             catalog_indicators_found = False
             
             for element in app_data_elements:
@@ -129,35 +277,26 @@ class EreklamkladScraper:
                     if not content:
                         continue
                     
-                    json_segments = self._extract_json_segments(content)
-                    
-                    for segment in json_segments:
-                        try:
-                            data = json.loads(segment)
-                            
-                            # Check for individual offer indicators
-                            offer_ids = self._extract_offers_from_json(data)
-                            if offer_ids:
-                                individual_offers_found = True
-                            
-                            # Check for catalog indicators
-                            if isinstance(data, dict) and 'publication' in data:
-                                pub_data = data['publication']
-                                if isinstance(pub_data, dict):
-                                    if 'pageCount' in pub_data and pub_data.get('pageCount', 0) > 1:
-                                        catalog_indicators_found = True
-                                    if 'images' in pub_data and isinstance(pub_data['images'], list) and len(pub_data['images']) > 1:
-                                        catalog_indicators_found = True
+                    # Decode lazily: individual offers are decisive, so stop at the
+                    # first segment containing any instead of decoding the rest
+                    for data in self._iter_json_segments(content):
+                        # Check for individual offer indicators
+                        if self._extract_offers_from_json(data):
+                            return "individual_offers"
                         
-                        except json.JSONDecodeError:
-                            continue
+                        # Check for catalog indicators
+                        if isinstance(data, dict) and 'publication' in data:
+                            pub_data = data['publication']
+                            if isinstance(pub_data, dict):
+                                if 'pageCount' in pub_data and pub_data.get('pageCount', 0) > 1:
+                                    catalog_indicators_found = True
+                                if 'images' in pub_data and isinstance(pub_data['images'], list) and len(pub_data['images']) > 1:
+                                    catalog_indicators_found = True
                 
                 except Exception:
                     continue
             
-            if individual_offers_found:
-                return "individual_offers"
-            elif catalog_indicators_found:
+            if catalog_indicators_found:
                 return "catalog"
             else:
                 return "unknown"
@@ -166,24 +305,46 @@ class EreklamkladScraper:
             logger.debug(f"Error detecting publication type: {e}")
             return "unknown"
     
+    def _get_publication_page(self, retailer_slug, publication_id):
+        """Fetch and parse a publication page once per discovery pass; None if it failed to load"""
+        key = (retailer_slug, publication_id)
+        soup = self._page_cache.get(key)
+        if soup is not None:
+            return soup
+        
+        url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
+        response = self.session.get(url, timeout=15)
+        
+        if response.status_code != 200:
+            logger.warning(f"Failed to load publication page: {response.status_code}")
+            return None
+        
+        soup = self._parse(_response_text(response))
+        self._page_cache[key] = soup
+        return soup
+    
+    def _parse(self, text):
+        """Parse HTML with lxml when available, falling back to html.parser"""
+        return BeautifulSoup(text, _HTML_PARSER)
+    
     def _extract_json_segments(self, content):
-        """Extract valid JSON segments from content that may contain multiple JSON objects"""
-        json_segments = []
-        brace_level = 0
-        start_pos = 0
-        
-        for pos, char in enumerate(content):
-            if char == '{':
-                if brace_level == 0:
-                    start_pos = pos
-                brace_level += 1
-            elif char == '}':
-                brace_level -= 1
-                if brace_level == 0:
-                    json_segment = content[start_pos:pos+1]
-                    json_segments.append(json_segment)
-        
-        return json_segments
+        """Decode the JSON objects embedded in content that may contain multiple JSON objects"""
+        return list(self._iter_json_segments(content))
+    
+    def _iter_json_segments(self, content):
+        """Yield the JSON objects embedded in content as each one is decoded"""
+        pos = content.find('{')
+        
+        # Let the C decoder find each object's end instead of counting braces
+        # in Python; this also handles braces inside strings correctly
+        while pos != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(content, pos)
+            except ValueError:
+                pos = content.find('{', pos + 1)
+                continue
+            yield obj
+            pos = content.find('{', end)
     
     def _scrape_individual_offers(self, retailer_key):
         """Scrape individual offers (like ICA Maxi)"""
@@ -201,16 +362,22 @@ class EreklamkladScraper:
         api_offers = self._extract_offers_from_api(retailer['publication_id'])
         all_offer_ids.update(api_offers)
         
-        # Method 3: Enhanced pattern-based discovery using seeds
-        if retailer['seed_offers']:
+        # Method 3: Enhanced pattern-based discovery using seeds (opt-in, see docstring)
+        if retailer['seed_offers'] and os.environ.get('LOCOPO_ENABLE_MUTATION_SCAN'):
             pattern_offers = self._discover_offers_by_patterns(retailer['slug'], retailer['publication_id'], retailer['seed_offers'])
             all_offer_ids.update(pattern_offers)
         
-        # Extract data for each offer
-        for offer_id in all_offer_ids:
-            offer_data = self.extract_offer_data(offer_id, retailer['slug'], retailer['publication_id'])
-            if offer_data:
-                offers.append(offer_data)
+        # Extract data for each offer; the fetches are independent, so
+        # overlap them on a bounded pool sharing the session
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self.extract_offer_data, offer_id, retailer['slug'], retailer['publication_id'])
+                for offer_id in all_offer_ids
+            ]
+            for future in as_completed(futures):
+                offer_data = future.result()
+                if offer_data:
+                    offers.append(offer_data)
         
         return offers
     
@@ -221,25 +388,19 @@ class EreklamkladScraper:
         
         try:
             url = f"{self.base_url}/{retailer['slug']}?publication={retailer['publication_id']}"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
+            soup = self._get_publication_page(retailer['slug'], retailer['publication_id'])
+            if soup is None:
                 return offers
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+            app_data_elements = soup.select('[id*="app-data"]')
             
             for element in app_data_elements:
                 content = element.get_text().strip()
                 if not content:
                     continue
                 
-                json_segments = self._extract_json_segments(content)
-                
-                for segment in json_segments:
+                for data in self._extract_json_segments(content):
                     try:
-                        data = json.loads(segment)
-                        
                         if isinstance(data, dict) and 'publication' in data:
                             pub_data = data['publication']
                             
@@ -264,8 +425,6 @@ class EreklamkladScraper:
                                 offers.append(catalog_offer)
                                 logger.info(f"Extracted catalog: {catalog_offer.name}")
                             
-                    except json.JSONDecodeError:
-                        continue
                     except Exception as e:
                         logger.debug(f"Error processing catalog data: {e}")
                         continue
@@ -279,71 +438,53 @@ class EreklamkladScraper:
         """Extract offer IDs from the main publication page - enhanced with app-data parsing"""
         logger.info("Extracting offers from publication page...")
         offers = set()
+        offer_index = {}
         
         try:
-            url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
-                logger.warning(f"Failed to load publication page: {response.status_code}")
+            soup = self._get_publication_page(retailer_slug, publication_id)
+            if soup is None:
                 return offers
-                
-            soup = BeautifulSoup(response.text, 'html.parser')
             
             # Strategy 1: Parse app-data elements (most reliable for modern SPAs)
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+            app_data_elements = soup.select('[id*="app-data"]')
+            script_texts = []
             for element in app_data_elements:
                 try:
                     data_content = element.get_text()
                     if data_content:
+                        if element.name != 'script':
+                            script_texts.append(data_content)
                         # Try to parse as JSON
                         try:
-                            json_data = json.loads(data_content)
-                            offers.update(self._extract_offers_from_json(json_data))
+                            json_data = _jloads(data_content)
+                            offers.update(self._extract_offers_from_json(json_data, offer_index))
                         except json.JSONDecodeError:
                             # Fall back to regex extraction
-                            id_patterns = [
-                                r'"id"\s*:\s*"([a-zA-Z0-9_-]{10,})"',
-                                r'"offerId"\s*:\s*"([a-zA-Z0-9_-]{10,})"',
-                                r'"offer_id"\s*:\s*"([a-zA-Z0-9_-]{10,})"'
-                            ]
-                            for pattern in id_patterns:
-                                matches = re.findall(pattern, data_content)
-                                offers.update(matches)
+                            for pattern in _ID_PATTERNS:
+                                offers.update(pattern.findall(data_content))
                 except Exception as e:
                     logger.debug(f"Error parsing app-data element: {e}")
                     continue
             
             # Strategy 2: Look for Next.js data elements
-            next_data = soup.find('script', id='__NEXT_DATA__')
+            next_data = soup.select_one('script#__NEXT_DATA__')
             if next_data:
                 try:
-                    data = json.loads(next_data.get_text())
-                    offers.update(self._extract_offers_from_json(data))
+                    data = _jloads(next_data.get_text())
+                    offers.update(self._extract_offers_from_json(data, offer_index))
                 except Exception as e:
                     logger.debug(f"Error parsing Next.js data: {e}")
             
-            # Strategy 3: Enhanced JavaScript variable extraction
-            js_content = response.text
-            offer_patterns = [
-                r'offers?\s*:\s*\[(.*?)\]',  # Array of offers
-                r'publication.*?offers?\s*:\s*\[(.*?)\]',
-                r'offer["\']?\s*:\s*["\']([a-zA-Z0-9_-]{10,})["\']',
-                r'offerId["\']?\s*:\s*["\']([a-zA-Z0-9_-]{10,})["\']',
-                r'id["\']?\s*:\s*["\']([a-zA-Z0-9_-]{17})["\']',  # Standard length
-                r'/offer/([a-zA-Z0-9_-]{10,})',
-                r'&offer=([a-zA-Z0-9_-]{10,})',
-                r'window\.__INITIAL_STATE__.*?"offers":\[(.*?)\]'
-            ]
-            
-            for pattern in offer_patterns:
-                matches = re.findall(pattern, js_content, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    if len(match) >= 10:  # Direct ID match
-                        offers.add(match)
-                    else:  # Array content - extract IDs
-                        id_matches = re.findall(r'["\']([a-zA-Z0-9_-]{10,})["\']', match)
-                        offers.update(id_matches)
+            # Strategy 3: Enhanced JavaScript variable extraction, scanning only the
+            # inline script bodies (app-data, __NEXT_DATA__, window state) rather
+            # than the whole HTML document
+            script_texts.extend(script.get_text() for script in soup.find_all('script', src=False))
+            js_content = '\n'.join(script_texts)
+            for match in _OFFER_ID_RE.finditer(js_content):
+                offers.add(match.group(match.lastgroup))
+            for pattern in _OFFER_ARRAY_PATTERNS:
+                for match in pattern.findall(js_content):
+                    offers.update(_QUOTED_ID_RE.findall(match))
             
             # Strategy 4: Look in data attributes and links
             for element in soup.find_all(attrs={"data-offer-id": True}):
@@ -352,12 +493,15 @@ class EreklamkladScraper:
             for link in soup.find_all('a', href=True):
                 href = link['href']
                 if 'offer=' in href:
-                    match = re.search(r'offer=([a-zA-Z0-9_-]+)', href)
+                    match = _HREF_OFFER_RE.search(href)
                     if match:
                         offers.add(match.group(1))
             
             # Clean up offers - remove invalid/short IDs
-            valid_offers = {offer for offer in offers if len(offer) >= 10 and re.match(r'^[a-zA-Z0-9_-]+$', offer)}
+            valid_offers = {offer for offer in offers if _VALID_ID_RE.match(offer)}
+            
+            # Keep the embedded offer objects so extract_offer_data can skip per-offer fetches
+            self._publication_cache[(retailer_slug, publication_id)] = offer_index
             
             logger.info(f"Found {len(valid_offers)} offers from publication page")
             
@@ -368,26 +512,29 @@ class EreklamkladScraper:
             
         return offers
     
-    def _extract_offers_from_json(self, json_data):
-        """Recursively extract offer IDs from JSON data structure"""
+    def _extract_offers_from_json(self, json_data, offer_index=None):
+        """Extract offer IDs from JSON data structure
+        
+        When offer_index is given, dicts that look like offers (an id plus a
+        price, name or image) are recorded in it keyed by id.
+        """
         offers = set()
         
-        def extract_recursive(obj):
+        # Explicit stack instead of recursion; large __NEXT_DATA__ blobs have many nodes
+        stack = [json_data]
+        while stack:
+            obj = stack.pop()
             if isinstance(obj, dict):
-                # Look for offer-related keys
+                if offer_index is not None and _looks_like_offer(obj):
+                    offer_index[obj['id']] = obj
                 for key, value in obj.items():
-                    if key.lower() in ['id', 'offerid', 'offer_id', 'offerId'] and isinstance(value, str) and len(value) >= 10:
+                    if key in _ID_KEYS and isinstance(value, str) and len(value) >= 10:
                         offers.add(value)
-                    elif key.lower() in ['offers', 'items', 'data', 'results'] and isinstance(value, list):
-                        for item in value:
-                            extract_recursive(item)
-                    else:
-                        extract_recursive(value)
+                    elif isinstance(value, (dict, list)):
+                        stack.append(value)
             elif isinstance(obj, list):
-                for item in obj:
-                    extract_recursive(item)
+                stack.extend(obj)
         
-        extract_recursive(json_data)
         return offers
     
     def _extract_offers_from_api(self, publication_id):
@@ -404,72 +551,97 @@ class EreklamkladScraper:
             f"{self.base_url}/api/v1/publications/{publication_id}/offers"
         ]
         
-        for endpoint in api_endpoints:
-            try:
-                logger.debug(f"Trying API endpoint: {endpoint}")
-                response = self.session.get(endpoint, timeout=10)
+        # Probe all endpoints at once and keep the first one that answers
+        # with offers; the misses no longer cost a full timeout each
+        executor = ThreadPoolExecutor(max_workers=len(api_endpoints))
+        try:
+            futures = {executor.submit(self._probe_api_endpoint, endpoint): endpoint for endpoint in api_endpoints}
+            for future in as_completed(futures):
+                endpoint_offers = future.result()
+                if endpoint_offers:
+                    logger.info(f"Found {len(endpoint_offers)} offers from API: {futures[future]}")
+                    offers = endpoint_offers
+                    break  # Use first successful API
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return offers
+    
+    def _probe_api_endpoint(self, endpoint):
+        """Fetch one candidate API endpoint and return the offer IDs it lists"""
+        offers = set()
+        
+        try:
+            logger.debug(f"Trying API endpoint: {endpoint}")
+            response = self.session.get(endpoint, timeout=10)
+            
+            if response.status_code == 200:
+                data = _jloads(response.content)
                 
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        
-                        # Parse different possible JSON structures
-                        if isinstance(data, list):
-                            for item in data:
+                # Parse different possible JSON structures
+                if isinstance(data, list):
+                    for item in data:
+                        if isinstance(item, dict) and 'id' in item:
+                            offers.add(item['id'])
+                elif isinstance(data, dict):
+                    # Check various common field names
+                    for key in ['offers', 'data', 'items', 'results']:
+                        if key in data and isinstance(data[key], list):
+                            for item in data[key]:
                                 if isinstance(item, dict) and 'id' in item:
                                     offers.add(item['id'])
-                        elif isinstance(data, dict):
-                            # Check various common field names
-                            for key in ['offers', 'data', 'items', 'results']:
-                                if key in data and isinstance(data[key], list):
-                                    for item in data[key]:
-                                        if isinstance(item, dict) and 'id' in item:
-                                            offers.add(item['id'])
-                        
-                        if offers:
-                            logger.info(f"Found {len(offers)} offers from API: {endpoint}")
-                            break  # Use first successful API
-                            
-                    except json.JSONDecodeError:
-                        continue
-                        
-            except Exception as e:
-                logger.debug(f"API endpoint {endpoint} failed: {e}")
-                continue
+                    
+        except Exception as e:
+            logger.debug(f"API endpoint {endpoint} failed: {e}")
         
         return offers
     
     def _discover_offers_by_patterns(self, retailer_slug, publication_id, seed_offers):
-        """Enhanced pattern-based discovery using known offers as seeds"""
+        """Enhanced pattern-based discovery using known offers as seeds
+        
+        Offer IDs are 17 characters over a ~64 symbol alphabet, so a random
+        mutation of a seed hits a live offer with probability around
+        n_offers / 64**17 -- effectively zero. Every candidate still costs a
+        live HTTP probe, which is why this only runs when
+        LOCOPO_ENABLE_MUTATION_SCAN is set and is capped at
+        min(40, 4 * len(seed_offers)) candidates probed concurrently.
+        """
         if not seed_offers:
             logger.info("No seed offers provided for pattern discovery")
             return set()
         
         logger.info(f"Pattern-based discovery using {len(seed_offers)} seeds...")
-        valid_offers = set(seed_offers)
-        
-        # More sophisticated pattern generation
-        for attempt in range(200):  # Increased attempts
-            base_id = random.choice(seed_offers)
-            
-            # Multiple mutation strategies
-            strategies = [
-                self._mutate_single_char,
-                self._mutate_multiple_chars,
-                self._mutate_similar_pattern,
-                self._generate_variant_id
-            ]
-            
-            strategy = random.choice(strategies)
-            new_id = strategy(base_id)
-            
-            if new_id not in valid_offers and len(new_id) == len(base_id):
-                if self._test_offer_exists(new_id, retailer_slug, publication_id):
+        known = set(seed_offers)
+        limit = min(40, 4 * len(seed_offers))
+        strategies = [
+            self._mutate_single_char,
+            self._mutate_multiple_chars,
+            self._mutate_similar_pattern,
+            self._generate_variant_id
+        ]
+        
+        # One pass of every strategy per seed, deduplicated and bounded
+        candidates = set()
+        for base_id in seed_offers:
+            for strategy in strategies:
+                new_id = strategy(base_id)
+                if new_id not in known and len(new_id) == len(base_id):
+                    candidates.add(new_id)
+        candidates = list(candidates)[:limit]
+        
+        valid_offers = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._test_offer_exists, candidate, retailer_slug, publication_id): candidate
+                for candidate in candidates
+            }
+            for future in as_completed(futures):
+                if future.result():
+                    new_id = futures[future]
                     valid_offers.add(new_id)
-                    seed_offers.append(new_id)  # Add to seed pool
                     logger.info(f"Found new offer via patterns: {new_id}")
         
-        return valid_offers - set(seed_offers)  # Return only new ones
+        return valid_offers
     
     def _mutate_single_char(self, offer_id):
         """Single character mutation"""
@@ -490,14 +662,15 @@ class EreklamkladScraper:
     
     def _mutate_similar_pattern(self, offer_id):
         """Preserve character type patterns (letter/digit/special)"""
-        result = []
-        for char in offer_id:
-            if char.isalpha():
-                result.append(random.choice(string.ascii_letters))
-            elif char.isdigit():
-                result.append(random.choice(string.digits))
-            else:
-                result.append(random.choice('_-'))
+        alpha_idx = [i for i, char in enumerate(offer_id) if char.isalpha()]
+        digit_idx = [i for i, char in enumerate(offer_id) if char.isdigit()]
+        special_idx = [i for i, char in enumerate(offer_id) if not (char.isalpha() or char.isdigit())]
+        
+        # One batched draw per character class instead of a random.choice per character
+        result = [''] * len(offer_id)
+        for indices, pool in ((alpha_idx, _ALPHA), (digit_idx, _DIGIT), (special_idx, _SPECIAL)):
+            for i, char in zip(indices, random.choices(pool, k=len(indices))):
+                result[i] = char
         return ''.join(result)
     
     def _generate_variant_id(self, offer_id):
@@ -520,6 +693,15 @@ class EreklamkladScraper:
 
     def _test_offer_exists(self, offer_id, retailer_slug=None, publication_id=None):
         """Enhanced offer existence test"""
+        if offer_id in self._exists_cache:
+            return self._exists_cache[offer_id]
+        
+        exists = self._probe_offer_urls(offer_id, retailer_slug, publication_id)
+        self._exists_cache[offer_id] = exists
+        return exists
+    
+    def _probe_offer_urls(self, offer_id, retailer_slug=None, publication_id=None):
+        """Probe the offer URLs, using HEAD to skip missing pages without a body download"""
         try:
             # Use defaults if not provided
             if not retailer_slug:
@@ -536,19 +718,19 @@ class EreklamkladScraper:
             
             for url in test_urls:
                 try:
+                    response = self.session.head(url, allow_redirects=True, timeout=4)
+                    if response.status_code >= 400 and response.status_code not in (405, 501):
+                        continue
+                    
                     response = self.session.get(url, timeout=8)
                     
                     # Check for success indicators
                     if response.status_code == 200:
-                        content = response.text.lower()
-                        # Look for positive indicators and avoid error indicators
-                        positive_signs = [offer_id.lower(), 'offer', 'price', 'product']
-                        negative_signs = ['not found', '404', 'error', 'ingen erbjudande']
-                        
-                        has_positive = any(sign in content for sign in positive_signs)
-                        has_negative = any(sign in content for sign in negative_signs)
-                        
-                        if has_positive and not has_negative:
+                        content = _response_text(response)
+                        # Avoid error indicators first, then look for positive indicators
+                        if _NEG_RE.search(content):
+                            continue
+                        if _POS_RE.search(content) or offer_id in content:
                             return True
                             
                 except:
@@ -563,8 +745,6 @@ class EreklamkladScraper:
     def extract_offer_data(self, offer_id, retailer_slug=None, publication_id=None):
         """Extract comprehensive offer data from the website"""
         try:
-            from .models import Offer
-            
             # Use defaults if not provided (for backward compatibility)
             if not retailer_slug:
                 retailer_slug = "ICA-Maxi-Stormarknad"
@@ -574,50 +754,83 @@ class EreklamkladScraper:
             # Primary URL for offer details
             url = f"{self.base_url}/{retailer_slug}?publication={publication_id}&offer={offer_id}"
             
-            response = self.session.get(url, timeout=15)
-            if response.status_code != 200:
-                logger.warning(f"Failed to load offer {offer_id}: {response.status_code}")
-                return None
+            # Prefer the offer object already embedded in the publication page
+            offer_data = None
+            cached = self._publication_cache.get((retailer_slug, publication_id), {}).get(offer_id)
+            if cached is not None:
+                offer_data = self._offer_fields(cached)
+            
+            if not offer_data or 'name' not in offer_data:
+                response = self.session.get(url, timeout=15)
+                if response.status_code != 200:
+                    logger.warning(f"Failed to load offer {offer_id}: {response.status_code}")
+                    return None
+                    
+                content = _response_text(response)
+                soup = self._parse(content)
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            content = response.text
-            
-            # Extract offer details using multiple strategies
-            offer_data = self._parse_offer_from_html(soup, content, offer_id)
-            
-            if offer_data:
-                return Offer(
-                    id=offer_id,
-                    publication_id=publication_id,
-                    business_id=retailer_slug.lower().replace('-', '_'),
-                    name=offer_data.get('name', f'Produkt {offer_id[:8]}'),
-                    description=offer_data.get('description'),
-                    price=offer_data.get('current_price'),
-                    original_price=offer_data.get('original_price'),
-                    currency=offer_data.get('currency', 'SEK'),
-                    business_name=offer_data.get('business_name', retailer_slug.replace('-', ' ').title()),
-                    image_url=offer_data.get('image_url'),
-                    valid_until=self._parse_date(offer_data.get('valid_until')),
-                    url=url
-                )
+                # Extract offer details using multiple strategies
+                offer_data = self._parse_offer_from_html(soup, content, offer_id)
+            
+            return self._build_offer(offer_id, retailer_slug, publication_id, url, offer_data)
                 
         except Exception as e:
             logger.error(f"Error extracting offer data for {offer_id}: {e}")
             
         return None
     
+    def extract_offer_data_from_html(self, offer_id, content, retailer_slug=None, publication_id=None):
+        """Extract offer data from an offer page the caller has already downloaded"""
+        try:
+            if not retailer_slug:
+                retailer_slug = "ICA-Maxi-Stormarknad"
+            if not publication_id:
+                publication_id = "5X0fxUgs"
+            
+            url = f"{self.base_url}/{retailer_slug}?publication={publication_id}&offer={offer_id}"
+            offer_data = self._parse_offer_from_html(self._parse(content), content, offer_id)
+            return self._build_offer(offer_id, retailer_slug, publication_id, url, offer_data)
+            
+        except Exception as e:
+            logger.error(f"Error extracting offer data for {offer_id}: {e}")
+            
+        return None
+    
+    def _build_offer(self, offer_id, retailer_slug, publication_id, url, offer_data):
+        """Turn extracted offer fields into an Offer, or None if nothing was found"""
+        from .models import Offer
+        
+        if offer_data:
+            return Offer(
+                id=offer_id,
+                publication_id=publication_id,
+                business_id=retailer_slug.lower().replace('-', '_'),
+                name=offer_data.get('name', f'Produkt {offer_id[:8]}'),
+                description=offer_data.get('description'),
+                price=offer_data.get('current_price'),
+                original_price=offer_data.get('original_price'),
+                currency=offer_data.get('currency', 'SEK'),
+                business_name=offer_data.get('business_name', retailer_slug.replace('-', ' ').title()),
+                image_url=offer_data.get('image_url'),
+                valid_until=self._parse_date(offer_data.get('valid_until')),
+                url=url
+            )
+        return None
+    
     def _parse_offer_from_html(self, soup, content, offer_id):
         """Parse offer details from HTML content - enhanced with app-data extraction"""
         offer_data = {}
         
         try:
             # Strategy 1: Parse app-data elements (most reliable based on analysis)
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+            app_data_elements = soup.select('[id*="app-data"]')
             for element in app_data_elements:
                 try:
                     data_content = element.get_text().strip()
-                    if data_content:
-                        json_data = json.loads(data_content)
+                    # Offer IDs are stored verbatim, so a blob that doesn't contain
+                    # the ID can't hold the offer; skip decoding and walking it
+                    if data_content and offer_id in data_content:
+                        json_data = _jloads(data_content)
                         
                         # Extract offer data from the structured data
                         extracted_data = self._extract_offer_from_app_data(json_data, offer_id)
@@ -634,7 +847,7 @@ class EreklamkladScraper:
             json_scripts = soup.find_all('script', type='application/ld+json')
             for script in json_scripts:
                 try:
-                    data = json.loads(script.string)
+                    data = _jloads(script.string)
                     if isinstance(data, dict) and 'offers' in data:
                         offer_info = data['offers']
                         if isinstance(offer_info, list):
@@ -659,37 +872,34 @@ class EreklamkladScraper:
                 'product:price:currency': 'currency'
             }
             
+            # Index the meta tags in one pass; the first tag per key wins and a
+            # property match takes precedence over a name match, as with find()
+            by_property = {}
+            by_name = {}
+            for meta_tag in soup.find_all('meta'):
+                if meta_tag.get('property'):
+                    by_property.setdefault(meta_tag['property'], meta_tag.get('content'))
+                if meta_tag.get('name'):
+                    by_name.setdefault(meta_tag['name'], meta_tag.get('content'))
+            
             for prop, field in meta_props.items():
-                meta_tag = soup.find('meta', property=prop) or soup.find('meta', attrs={'name': prop})
-                if meta_tag and meta_tag.get('content'):
+                meta_content = by_property[prop] if prop in by_property else by_name.get(prop)
+                if meta_content:
                     if field == 'current_price':
-                        offer_data[field] = self._extract_price(meta_tag['content'])
+                        offer_data[field] = self._extract_price(meta_content)
                     else:
-                        offer_data[field] = meta_tag['content']
+                        offer_data[field] = meta_content
             
             # Strategy 4: Look for price patterns in content (fallback)
             if 'current_price' not in offer_data:
-                price_patterns = [
-                    r'(\d+)[,.](\d+)\s*kr',
-                    r'(\d+)\s*kr',
-                    r'price["\']?\s*:\s*["\']?(\d+(?:[,.]?\d+)?)',
-                    r'pris["\']?\s*:\s*["\']?(\d+(?:[,.]?\d+)?)'
-                ]
-                
-                for pattern in price_patterns:
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    if matches:
-                        price_match = matches[0]
-                        if isinstance(price_match, tuple):
-                            price_str = '.'.join(price_match)
-                        else:
-                            price_str = price_match
-                        
-                        try:
-                            offer_data['current_price'] = float(price_str.replace(',', '.'))
-                            break
-                        except:
-                            continue
+                # One scan for all price forms; the earliest price on the page wins
+                match = _PRICE_RE.search(content)
+                if match:
+                    price_str = match.group(match.lastgroup)
+                    try:
+                        offer_data['current_price'] = float(price_str.replace(',', '.'))
+                    except ValueError:
+                        pass
             
             # Strategy 5: Extract product name from page title or headings (fallback)
             if 'name' not in offer_data:
@@ -698,8 +908,8 @@ class EreklamkladScraper:
                 if title_tag:
                     title = title_tag.get_text().strip()
                     # Clean up title (remove site name, etc.)
-                    title = re.sub(r'\s*-\s*ICA.*$', '', title)
-                    title = re.sub(r'\s*\|\s*eReklamblad.*$', '', title)
+                    title = _TITLE_CLEAN_ICA.sub('', title)
+                    title = _TITLE_CLEAN_EREK.sub('', title)
                     if title and len(title) > 3:
                         offer_data['name'] = title
                 
@@ -712,30 +922,15 @@ class EreklamkladScraper:
                             break
             
             # Strategy 6: Look for category information
-            category_selectors = [
-                '.category', '.breadcrumb', '[data-category]',
-                '.product-category', '.offer-category'
-            ]
-            
-            for selector in category_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    category_text = element.get_text().strip()
-                    if category_text and len(category_text) < 50:
-                        offer_data['category'] = category_text
-                        break
-                if 'category' in offer_data:
+            for element in soup.select(_CATEGORY_SELECTOR):
+                category_text = element.get_text().strip()
+                if category_text and len(category_text) < 50:
+                    offer_data['category'] = category_text
                     break
             
             # Strategy 7: Look for validity dates
-            date_patterns = [
-                r'gäller.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                r'till.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                r'valid.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-            ]
-            
-            for pattern in date_patterns:
-                matches = re.search(pattern, content, re.IGNORECASE)
+            for pattern in _DATE_PATTERNS:
+                matches = pattern.search(content)
                 if matches:
                     offer_data['valid_until'] = matches.group(1)
                     break
@@ -747,47 +942,36 @@ class EreklamkladScraper:
     
     def _extract_offer_from_app_data(self, json_data, offer_id):
         """Extract offer data from app-data JSON structure"""
-        offer_data = {}
-        
-        def search_recursive(obj, path=""):
+        # Explicit stack, children pushed in reverse so the first match in
+        # document order wins as it did with the recursive walk
+        stack = [json_data]
+        while stack:
+            obj = stack.pop()
             if isinstance(obj, dict):
                 # Look for offer-specific data
-                if 'id' in obj and obj['id'] == offer_id:
+                if obj.get('id') == offer_id:
                     # Found matching offer, extract all relevant data
-                    offer_data.update({
-                        'name': obj.get('name') or obj.get('title') or obj.get('productName'),
-                        'description': obj.get('description') or obj.get('productDescription'),
-                        'current_price': self._extract_price(obj.get('price') or obj.get('currentPrice') or obj.get('salePrice')),
-                        'original_price': self._extract_price(obj.get('originalPrice') or obj.get('regularPrice')),
-                        'currency': obj.get('currency') or obj.get('priceCurrency', 'SEK'),
-                        'image_url': obj.get('image') or obj.get('imageUrl') or obj.get('thumbnail'),
-                        'valid_until': obj.get('validUntil') or obj.get('endDate') or obj.get('expiryDate'),
-                        'category': obj.get('category') or obj.get('productCategory'),
-                        'business_name': obj.get('retailer') or obj.get('store') or obj.get('businessName', 'ICA Maxi')
-                    })
-                    return True
-                
-                # Continue searching in nested objects
-                for key, value in obj.items():
-                    if search_recursive(value, f"{path}.{key}" if path else key):
-                        return True
-                        
+                    return self._offer_fields(obj)
+                stack.extend(reversed(obj.values()))
             elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    if search_recursive(item, f"{path}[{i}]" if path else f"[{i}]"):
-                        return True
-                        
-            return False
+                stack.extend(reversed(obj))
         
-        search_recursive(json_data)
-        
-        # Clean up extracted data
-        cleaned_data = {}
-        for key, value in offer_data.items():
-            if value is not None and value != "":
-                cleaned_data[key] = value
+        return {}
+    
+    def _offer_fields(self, obj):
+        """Map an embedded offer JSON object to offer fields, dropping empty values"""
+        offer_data = {}
+        for field, aliases in _OFFER_FIELD_KEYS.items():
+            # First non-empty alias wins, in order of preference
+            value = next((obj[alias] for alias in aliases if obj.get(alias)), None)
+            if field in _PRICE_FIELDS:
+                value = self._extract_price(value)
+            if value is None or value == "":
+                value = _OFFER_FIELD_DEFAULTS.get(field)
+            if value is not None:
+                offer_data[field] = value
         
-        return cleaned_data
+        return offer_data
     
     def _extract_price(self, price_str):
         """Extract numeric price from string"""
@@ -799,9 +983,7 @@ class EreklamkladScraper:
                 return float(price_str)
             
             # Clean up price string
-            price_str = str(price_str).strip()
-            price_str = re.sub(r'[^\d,.]', '', price_str)
-            price_str = price_str.replace(',', '.')
+            price_str = str(price_str).strip().translate(_PRICE_CHARS).replace(',', '.')
             
             if price_str:
                 return float(price_str)
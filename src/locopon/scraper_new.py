@@ -1,7 +1,6 @@
 #!/usr/bin/env python3  
 # -*- coding: utf-8 -*-
 
-import requests
 import json
 import logging
 import time
@@ -10,12 +9,16 @@ import string
 from typing import List, Optional, Dict, Any
 from bs4 import BeautifulSoup
 
+from ._http import get_session
+
 logger = logging.getLogger(__name__)
 
+# Replacement characters for ID mutation, built once rather than per call
+_ID_ALPHABET = string.ascii_letters + string.digits
+
 class EreklamkladScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_session({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
@@ -50,13 +53,17 @@ class EreklamkladScraper:
     def _mutate_id(self, offer_id):
         """Simple mutation"""
         pos = random.randint(0, len(offer_id) - 1)
-        new_char = random.choice(string.ascii_letters + string.digits)
+        new_char = random.choice(_ID_ALPHABET)
         return offer_id[:pos] + new_char + offer_id[pos+1:]
     
     def _test_offer_exists(self, offer_id):
         """Test if offer exists"""
         try:
             url = f"{self.base_url}&offer={offer_id}"
+            # Rule out missing offers from the status alone before downloading the page
+            response = self.session.head(url, timeout=10, allow_redirects=True)
+            if response.status_code not in (200, 405, 501):
+                return False
             response = self.session.get(url, timeout=10)
             return response.status_code == 200 and offer_id in response.text
         except:
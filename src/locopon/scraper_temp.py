@@ -7,19 +7,62 @@ Based on discoveries: Individual offer pages contain complete data via app-data
 Strategy: Build a complete system using known offer patterns and validate through testing
 """
 
-import requests
-from bs4 import BeautifulSoup
+import lxml.html
 import json
 import base64
 import re
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from ._http import get_session
+
+# orjson parses the app-data blobs and writes the result files several times
+# faster than the stdlib; both paths emit UTF-8 bytes
+try:
+    import orjson
+    _jloads = orjson.loads
+    
+    def _jdumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    _jloads = json.loads
+    
+    def _jdumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+class RateLimiter:
+    """Spaces requests across all worker threads to at most max_qps per second"""
+    
+    def __init__(self, max_qps: float):
+        self.interval = 1.0 / max_qps
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+    
+    def wait(self):
+        """Block only as long as needed to stay under the global rate"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 class CompleteOfferSystem:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, max_workers: int = 8, max_qps: float = 5.0):
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(max_qps)
+        
+        # Pooled keep-alive connections shared with the other scrapers
+        self.session = get_session()
+        
+        # Bodies of valid offer pages fetched by the GET probe fallback, held
+        # until extraction takes them so the page isn't downloaded twice
+        self._page_cache = {}
+        self._page_cache_lock = threading.Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -41,30 +84,46 @@ class CompleteOfferSystem:
             "eD8iZN3FEEHNxE3m8CQhC"
         ]
     
+    def _fetch_offer_page(self, offer_id: str):
+        """Fetch an offer page, returning (status_code, raw body bytes)"""
+        url = f"{self.base_url}&offer={offer_id}"
+        self.rate_limiter.wait()
+        response = self.session.get(url, headers=self.headers, timeout=15)
+        # lxml decodes the bytes using the page's own charset declaration,
+        # so requests never has to guess the encoding
+        return response.status_code, response.content
+    
+    def _fetch(self, offer_id: str):
+        """Fetch an offer page, taking the body from the probe cache if present"""
+        with self._page_cache_lock:
+            content = self._page_cache.pop(offer_id, None)
+        if content is not None:
+            return 200, content
+        return self._fetch_offer_page(offer_id)
+    
     def extract_offer_data_from_page(self, offer_id: str) -> Optional[Dict]:
         """Extract complete offer data from an offer page"""
-        url = f"{self.base_url}&offer={offer_id}"
-        
         try:
-            response = self.session.get(url, headers=self.headers, timeout=15)
-            if response.status_code != 200:
+            status_code, content = self._fetch(offer_id)
+            if status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            app_data_elements = soup.find_all('app-data')
+            # Only the <app-data> text is used; select it with XPath straight
+            # from the lxml tree instead of wrapping it in BeautifulSoup
+            doc = lxml.html.fromstring(content)
+            app_data_texts = [elem.text_content() for elem in doc.xpath('//app-data')]
             
             # Look for the offer-specific data
-            for elem in app_data_elements:
-                if elem.text.strip():
+            for app_data in app_data_texts:
+                # IDs are stored verbatim, so a blob that doesn't contain the ID
+                # can't be our offer; skip it without building the dict at all
+                if app_data.strip() and offer_id in app_data:
                     try:
-                        data = json.loads(elem.text)
+                        data = _jloads(app_data)
                         
-                        # Check if this contains our offer ID
-                        data_str = json.dumps(data)
-                        if offer_id in data_str:
-                            # This is our offer data!
-                            if isinstance(data, dict) and 'publicId' in data and data['publicId'] == offer_id:
-                                return data
+                        # This is our offer data!
+                        if isinstance(data, dict) and data.get('publicId') == offer_id:
+                            return data
                                 
                     except json.JSONDecodeError:
                         continue
@@ -77,9 +136,19 @@ class CompleteOfferSystem:
     
     def test_offer_exists(self, offer_id: str) -> bool:
         """Test if an offer ID exists"""
-        url = f"{self.base_url}&offer={offer_id}"
         try:
-            response = self.session.get(url, headers=self.headers, timeout=10)
+            # Only the status is needed, so skip the body unless HEAD is refused
+            url = f"{self.base_url}&offer={offer_id}"
+            self.rate_limiter.wait()
+            response = self.session.head(url, headers=self.headers, timeout=10, allow_redirects=True)
+            if response.status_code in (405, 501):
+                status_code, content = self._fetch_offer_page(offer_id)
+                if status_code != 200:
+                    return False
+                # Only successful pages are kept, for the extraction pass
+                with self._page_cache_lock:
+                    self._page_cache[offer_id] = content
+                return True
             return response.status_code == 200
         except:
             return False
@@ -88,7 +157,9 @@ class CompleteOfferSystem:
         """Generate potential offer IDs based on known patterns"""
         print(f"🧬 Generating {count} potential offer IDs from {len(seed_offers)} seeds...")
         
-        potential_ids = []
+        # Deduplicate as we go rather than collecting every duplicate first
+        potential_ids = set()
+        seed_set = set(seed_offers)
         
         # Analyze patterns from seed offers
         char_sets = {
@@ -98,36 +169,35 @@ class CompleteOfferSystem:
             'special': '_-'
         }
         
+        def charset_for(char):
+            # Determine character type so mutations pick from the same type
+            if char.isupper():
+                return char_sets['letters_upper']
+            elif char.islower():
+                return char_sets['letters_lower']
+            elif char.isdigit():
+                return char_sets['digits']
+            return char_sets['special']
+        
         for seed in seed_offers:
+            # Classify each position once per seed rather than per mutation
+            seed_charsets = [charset_for(char) for char in seed]
+            positions = tuple(range(len(seed)))
+            
             # Generate variations by changing 1-2 characters
             for _ in range(count // len(seed_offers)):
                 # Create variation
                 seed_list = list(seed)
                 
                 # Change 1-2 positions randomly
-                positions_to_change = random.sample(range(len(seed)), random.randint(1, 2))
-                
-                for pos in positions_to_change:
-                    old_char = seed[pos]
-                    
-                    # Determine character type and pick from same type
-                    if old_char.isupper():
-                        new_char = random.choice(char_sets['letters_upper'])
-                    elif old_char.islower():
-                        new_char = random.choice(char_sets['letters_lower'])
-                    elif old_char.isdigit():
-                        new_char = random.choice(char_sets['digits'])
-                    else:
-                        new_char = random.choice(char_sets['special'])
-                    
-                    seed_list[pos] = new_char
+                for pos in random.sample(positions, random.randint(1, 2)):
+                    seed_list[pos] = random.choice(seed_charsets[pos])
                 
                 potential_id = ''.join(seed_list)
-                if potential_id not in seed_offers:  # Don't include known ones
-                    potential_ids.append(potential_id)
+                if potential_id not in seed_set:  # Don't include known ones
+                    potential_ids.add(potential_id)
         
-        # Remove duplicates
-        unique_ids = list(set(potential_ids))
+        unique_ids = list(potential_ids)
         print(f"Generated {len(unique_ids)} unique potential IDs")
         return unique_ids
     
@@ -151,23 +221,23 @@ class CompleteOfferSystem:
         potential_offers = self.generate_potential_offer_ids(self.seed_offers, max_attempts)
         
         print(f"\nTesting {len(potential_offers)} generated offers (with rate limiting)...")
+        candidates = potential_offers[:max_attempts]
         tested = 0
         
-        for i, offer_id in enumerate(potential_offers):
-            if tested >= max_attempts:
-                break
+        # Probes are network-bound; overlap them while the shared limiter keeps the request rate down
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.test_offer_exists, offer_id): offer_id for offer_id in candidates}
+            for future in as_completed(futures):
+                offer_id = futures[future]
+                if future.result():
+                    valid_offers.append(offer_id)
+                    print(f"  ✅ {offer_id}: New valid offer found!")
                 
-            if self.test_offer_exists(offer_id):
-                valid_offers.append(offer_id)
-                print(f"  ✅ {offer_id}: New valid offer found!")
-            
-            tested += 1
-            
-            # Progress indicator and rate limiting
-            if tested % 10 == 0:
-                print(f"  Progress: {tested}/{min(max_attempts, len(potential_offers))}")
-            
-            time.sleep(0.2)  # Rate limiting
+                tested += 1
+                
+                # Progress indicator
+                if tested % 10 == 0:
+                    print(f"  Progress: {tested}/{len(candidates)}")
         
         unique_valid = list(set(valid_offers))
         print(f"\n📊 Discovery complete: {len(unique_valid)} unique valid offers found")
@@ -179,17 +249,22 @@ class CompleteOfferSystem:
         
         offer_data = {}
         
-        for i, offer_id in enumerate(offer_ids):
-            print(f"  Extracting {i+1}/{len(offer_ids)}: {offer_id}")
-            
-            data = self.extract_offer_data_from_page(offer_id)
-            if data:
-                offer_data[offer_id] = data
-                print(f"    ✅ Data extracted: {data.get('name', 'Unknown product')}")
-            else:
-                print(f"    ❌ Failed to extract data")
-            
-            time.sleep(1)  # Rate limiting
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.extract_offer_data_from_page, offer_id): offer_id for offer_id in offer_ids}
+            for i, future in enumerate(as_completed(futures)):
+                offer_id = futures[future]
+                print(f"  Extracted {i+1}/{len(offer_ids)}: {offer_id}")
+                
+                data = future.result()
+                if data:
+                    offer_data[offer_id] = data
+                    print(f"    ✅ Data extracted: {data.get('name', 'Unknown product')}")
+                else:
+                    print(f"    ❌ Failed to extract data")
+        
+        # Drop bodies of probed offers that weren't extracted
+        with self._page_cache_lock:
+            self._page_cache.clear()
         
         return offer_data
     
@@ -199,8 +274,8 @@ class CompleteOfferSystem:
         
         # Save complete offer data
         filename = f"complete_offers_data_{timestamp}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(offer_data, f, ensure_ascii=False, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(_jdumps(offer_data, indent=True))
         
         print(f"💾 Complete data saved to: {filename}")
         
@@ -223,8 +298,8 @@ class CompleteOfferSystem:
             })
         
         summary_filename = f"offers_summary_{timestamp}.json" 
-        with open(summary_filename, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(summary_filename, 'wb') as f:
+            f.write(_jdumps(summary, indent=True))
         
         print(f"📋 Summary saved to: {summary_filename}")
         
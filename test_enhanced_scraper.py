@@ -4,7 +4,9 @@
 import sys
 import os
 import logging
+import logging.handlers
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src directory to path
@@ -18,6 +20,38 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Per-offer report lines are buffered and written out in one batch after the
+# loop instead of taking the stdout lock on every line
+_report = logging.getLogger(__name__ + '.report')
+_report.setLevel(logging.INFO)
+_report.propagate = False
+_report_stream = logging.StreamHandler(sys.stdout)
+_report_stream.setFormatter(logging.Formatter('%(message)s'))
+_report_buffer = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=_report_stream)
+_report.addHandler(_report_buffer)
+
+# Cache responses on disk across runs if requests-cache is available; this
+# must happen before the scraper creates its session
+try:
+    import requests_cache
+    requests_cache.install_cache('.http_cache', expire_after=3600)
+except ImportError:
+    pass
+
+def probe_offer_url(session, offer_id):
+    """Fetch an offer page to check it is accessible"""
+    url = f"https://ereklamblad.se/ICA-Maxi-Stormarknad?publication=5X0fxUgs&offer={offer_id}"
+    return session.get(url, timeout=10)
+
+def probe_and_extract(scraper, offer_id):
+    """Probe an offer page and, if it is accessible, extract the offer's data"""
+    response = probe_offer_url(scraper.session, offer_id)
+    # Extract from the page just downloaded rather than fetching it a second time
+    offer_data = None
+    if response.status_code == 200:
+        offer_data = scraper.extract_offer_data_from_html(offer_id, response.text)
+    return response, offer_data
+
 def test_enhanced_scraper():
     """Test the enhanced scraper with known offer IDs"""
     try:
@@ -42,41 +76,45 @@ def test_enhanced_scraper():
         
         successful_extractions = 0
         
-        for i, offer_id in enumerate(test_offers, 1):
-            print(f"🔍 Testing offer {i}/{len(test_offers)}: {offer_id}")
+        # Probe and extract all offers at once over the scraper's pooled
+        # session, then report on them in order
+        executor = ThreadPoolExecutor(max_workers=min(8, len(test_offers)))
+        probes = [executor.submit(probe_and_extract, scraper, offer_id) for offer_id in test_offers]
+        executor.shutdown(wait=False)
+        
+        for i, (offer_id, probe) in enumerate(zip(test_offers, probes), 1):
+            _report.info(f"🔍 Testing offer {i}/{len(test_offers)}: {offer_id}")
             
             try:
                 # Test URL accessibility
-                url = f"https://ereklamblad.se/ICA-Maxi-Stormarknad?publication=5X0fxUgs&offer={offer_id}"
-                response = scraper.session.get(url, timeout=10)
+                response, offer_data = probe.result()
                 
-                print(f"   📡 URL Status: {response.status_code}")
-                print(f"   📄 Content Length: {len(response.text)} chars")
+                _report.info(f"   📡 URL Status: {response.status_code}")
+                _report.info(f"   📄 Content Length: {len(response.text)} chars")
                 
                 if response.status_code == 200:
-                    # Extract offer data
-                    offer_data = scraper.extract_offer_data(offer_id)
-                    
                     if offer_data:
                         successful_extractions += 1
-                        print(f"   ✅ Extraction successful!")
-                        print(f"   📦 Product: {offer_data.name}")
-                        print(f"   💰 Price: {offer_data.price} {offer_data.currency}")
+                        _report.info(f"   ✅ Extraction successful!")
+                        _report.info(f"   📦 Product: {offer_data.name}")
+                        _report.info(f"   💰 Price: {offer_data.price} {offer_data.currency}")
                         if offer_data.description:
                             desc = offer_data.description[:100] + "..." if len(offer_data.description) > 100 else offer_data.description
-                            print(f"   📝 Description: {desc}")
+                            _report.info(f"   📝 Description: {desc}")
                         if offer_data.image_url:
-                            print(f"   🖼️ Image: {offer_data.image_url}")
-                        print(f"   🏪 Store: {offer_data.business_name}")
+                            _report.info(f"   🖼️ Image: {offer_data.image_url}")
+                        _report.info(f"   🏪 Store: {offer_data.business_name}")
                     else:
-                        print(f"   ❌ Failed to extract offer data")
+                        _report.info(f"   ❌ Failed to extract offer data")
                 else:
-                    print(f"   ❌ Failed to access URL")
+                    _report.info(f"   ❌ Failed to access URL")
                     
             except Exception as e:
-                print(f"   💥 Error testing {offer_id}: {e}")
+                _report.info(f"   💥 Error testing {offer_id}: {e}")
             
-            print()
+            _report.info("")
+        
+        _report_buffer.flush()
         
         print("=" * 50)
         print(f"📊 Results Summary:")
@@ -8,6 +8,7 @@ Test script for the enhanced eReklamblad scraper
 import sys
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -20,6 +21,13 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Re-runs read from a local response cache when requests-cache is installed
+try:
+    import requests_cache
+    requests_cache.install_cache('.http_cache', expire_after=3600)
+except ImportError:
+    pass
+
 def test_scraper():
     """Test the enhanced scraper functionality"""
     print("🚀 Testing Enhanced eReklamblad Scraper...")
@@ -36,9 +44,14 @@ def test_scraper():
         # Test 2: Extract detailed data for first few offers
         print(f"\n📝 Testing data extraction for first 3 offers...")
         
-        for i, offer_id in enumerate(offers[:3]):
+        # Extraction is network-bound, so run the requests concurrently over
+        # the scraper's session and report in order
+        sample = offers[:3]
+        with ThreadPoolExecutor(max_workers=min(8, len(sample))) as executor:
+            extracted = list(executor.map(scraper.extract_offer_data, sample))
+        
+        for i, (offer_id, offer_data) in enumerate(zip(sample, extracted)):
             print(f"\n🔍 Extracting data for offer {i+1}: {offer_id}")
-            offer_data = scraper.extract_offer_data(offer_id)
             
             if offer_data:
                 print(f"  ✅ Name: {offer_data.name}")
@@ -2,9 +2,52 @@
 
 import requests
 import json
+import re
 from bs4 import BeautifulSoup
 import time
 
+# lxml parses in C; bytes input lets it read the page's declared encoding
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Matches app-data element ids; bs4 tests a compiled pattern with search()
+_APP_DATA_ID_RE = re.compile(r'app-data')
+# Page number in page image URLs such as /Hn02_ny6/p-1.webp
+_PAGE_NUM_RE = re.compile(r'/p-(\d+)\.')
+
+# Uncompressed sizes, so HEAD, ranged and full responses report comparable lengths
+_PROBE_HEADERS = {'Accept-Encoding': 'identity'}
+
+def probe(session, url):
+    """Return (status, body length in bytes) for url, downloading as little as possible
+
+    HEAD's Content-Length is used when the server sends one; otherwise a 4 KiB
+    ranged GET reads the total size from Content-Range. Only a server that
+    supports neither has the full body fetched.
+    """
+    response = session.head(url, headers=_PROBE_HEADERS, allow_redirects=True, timeout=10)
+    length = response.headers.get('Content-Length')
+    if response.status_code not in (405, 501) and length is not None:
+        return response.status_code, int(length)
+    
+    ranged = dict(_PROBE_HEADERS, Range='bytes=0-4095')
+    with session.get(url, headers=ranged, stream=True, timeout=10) as response:
+        if response.status_code != 206:
+            # Range ignored (or an error page): the body is all there is
+            return response.status_code, len(response.content)
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+    
+    if total.isdigit():
+        return 200, int(total)
+    
+    response = session.get(url, headers=_PROBE_HEADERS, timeout=10)
+    return response.status_code, len(response.content)
+
 def test_page_access_methods():
     """Test different methods to access individual pages of Willys publication"""
     
@@ -29,57 +72,45 @@ def test_page_access_methods():
     
     page_urls = []
     if pub_response.status_code == 200:
-        soup = BeautifulSoup(pub_response.text, 'html.parser')
-        app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+        soup = BeautifulSoup(pub_response.content, _HTML_PARSER)
+        app_data_elements = soup.find_all(id=_APP_DATA_ID_RE)
         
         # Look for page URLs or IDs in the publication data
         for element in app_data_elements:
             content = element.get_text().strip()
             
-            # Extract JSON segments
-            json_segments = []
-            brace_level = 0
-            start_pos = 0
-            
-            for pos, char in enumerate(content):
-                if char == '{':
-                    if brace_level == 0:
-                        start_pos = pos
-                    brace_level += 1
-                elif char == '}':
-                    brace_level -= 1
-                    if brace_level == 0:
-                        json_segment = content[start_pos:pos+1]
-                        json_segments.append(json_segment)
-            
-            for segment in json_segments:
+            # Decode each embedded JSON object; raw_decode finds its end in C
+            pos = content.find('{')
+            while pos != -1:
                 try:
-                    data = json.loads(segment)
-                    if isinstance(data, dict) and 'publication' in data:
-                        pub_data = data['publication']
-                        
-                        print(f"📚 Publication Details:")
-                        print(f"   Name: {pub_data.get('name', 'Unknown')}")
-                        print(f"   Type: {pub_data.get('type', 'Unknown')}")
-                        print(f"   Page Count: {pub_data.get('pageCount', 'Unknown')}")
-                        
-                        # Look for page-specific URLs or data
-                        if 'images' in pub_data and isinstance(pub_data['images'], list):
-                            print(f"   📄 Found {len(pub_data['images'])} page images")
-                            
-                            for i, img in enumerate(pub_data['images'][:5], 1):
-                                if isinstance(img, dict):
-                                    img_url = img.get('url', img.get('src', 'No URL'))
-                                    print(f"      Page {i}: {img_url}")
-                                    
-                                    # Extract page identifier from image URL
-                                    # Usually like: /Hn02_ny6/p-1.webp, /Hn02_ny6/p-2.webp
-                                    if 'p-' in img_url:
-                                        page_num = img_url.split('p-')[1].split('.')[0]
-                                        page_urls.append(f"p-{page_num}")
-                
+                    data, end = _JSON_DECODER.raw_decode(content, pos)
                 except json.JSONDecodeError:
+                    pos = content.find('{', pos + 1)
                     continue
+                pos = content.find('{', end)
+                
+                if isinstance(data, dict) and 'publication' in data:
+                    pub_data = data['publication']
+                    
+                    print(f"📚 Publication Details:")
+                    print(f"   Name: {pub_data.get('name', 'Unknown')}")
+                    print(f"   Type: {pub_data.get('type', 'Unknown')}")
+                    print(f"   Page Count: {pub_data.get('pageCount', 'Unknown')}")
+                    
+                    # Look for page-specific URLs or data
+                    if 'images' in pub_data and isinstance(pub_data['images'], list):
+                        print(f"   📄 Found {len(pub_data['images'])} page images")
+                        
+                        for i, img in enumerate(pub_data['images'][:5], 1):
+                            if isinstance(img, dict):
+                                img_url = img.get('url', img.get('src', 'No URL'))
+                                print(f"      Page {i}: {img_url}")
+                                
+                                # Extract page identifier from image URL
+                                # Usually like: /Hn02_ny6/p-1.webp, /Hn02_ny6/p-2.webp
+                                page_match = _PAGE_NUM_RE.search(img_url)
+                                if page_match:
+                                    page_urls.append(f"p-{page_match.group(1)}")
     
     print(f"\n🔍 Found potential page identifiers: {page_urls}")
     
@@ -117,23 +148,24 @@ def test_page_access_methods():
             print(f"   Testing {test_val}: ", end="")
             
             try:
-                response = session.get(test_url, timeout=10)
-                content_length = len(response.text)
+                # Compare sizes first; only a page that differs is downloaded
+                status_code, content_length = probe(session, test_url)
                 
-                if response.status_code == 200:
+                if status_code == 200:
                     # Check if content is different from base
                     if base_content_length is None:
                         # Use first successful response as baseline
                         base_content_length = content_length
-                        print(f"✅ {response.status_code} ({content_length:,} chars) [BASE]")
+                        print(f"✅ {status_code} ({content_length:,} bytes) [BASE]")
                     else:
                         diff = abs(content_length - base_content_length)
                         if diff > 1000:  # Significant difference
-                            print(f"✅ {response.status_code} ({content_length:,} chars) [DIFFERENT +{diff:,}]")
+                            print(f"✅ {status_code} ({content_length:,} bytes) [DIFFERENT +{diff:,}]")
                             
                             # This might be a real different page - analyze it
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            app_data = soup.find_all(id=lambda x: x and 'app-data' in x)
+                            response = session.get(test_url, timeout=10)
+                            soup = BeautifulSoup(response.content, _HTML_PARSER)
+                            app_data = soup.find_all(id=_APP_DATA_ID_RE)
                             
                             if app_data:
                                 successful_results[test_url] = {
@@ -143,16 +175,16 @@ def test_page_access_methods():
                                     'pattern': pattern_num
                                 }
                         elif diff > 100:
-                            print(f"⚠️ {response.status_code} ({content_length:,} chars) [MINOR DIFF +{diff}]")
+                            print(f"⚠️ {status_code} ({content_length:,} bytes) [MINOR DIFF +{diff}]")
                         else:
-                            print(f"➖ {response.status_code} ({content_length:,} chars) [SAME]")
+                            print(f"➖ {status_code} ({content_length:,} bytes) [SAME]")
                 else:
-                    print(f"❌ {response.status_code}")
+                    print(f"❌ {status_code}")
                     
             except Exception as e:
                 print(f"💥 Error: {str(e)[:50]}...")
             
-            time.sleep(0.5)  # Be nice to server
+            time.sleep(0.1)  # Be nice to server; size probes are cheap
     
     if successful_results:
         print(f"\n✅ Found {len(successful_results)} URLs with different content!")
@@ -160,7 +192,7 @@ def test_page_access_methods():
         
         for url, info in successful_results.items():
             print(f"   🎯 {url}")
-            print(f"      Content: {info['content_length']:,} chars")
+            print(f"      Content: {info['content_length']:,} bytes")
             print(f"      App-data: {info['app_data_elements']} elements")
             print(f"      Pattern: {info['pattern']}")
         
@@ -170,8 +202,8 @@ def test_page_access_methods():
         
         test_response = session.get(best_url, timeout=15)
         if test_response.status_code == 200:
-            test_soup = BeautifulSoup(test_response.text, 'html.parser')
-            test_app_data = test_soup.find_all(id=lambda x: x and 'app-data' in x)
+            test_soup = BeautifulSoup(test_response.content, _HTML_PARSER)
+            test_app_data = test_soup.find_all(id=_APP_DATA_ID_RE)
             
             offers_found = 0
             for element in test_app_data:
@@ -2,22 +2,82 @@
 # -*- coding: utf-8 -*-
 
 import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from urllib3.util.retry import Retry
 import json
 import logging
+import functools
 import time
 import random
 import string
 import re
+import html
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
+# lxml is a C parser and several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+# Elements whose id contains "app-data", with their inner content, matched on
+# the undecoded page bytes
+_APP_DATA_RE = re.compile(
+    rb'<([a-zA-Z][\w-]*)\b[^>]*\bid=["\'][^"\']*app-data[^"\']*["\'][^>]*>(.*?)</\1\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Returned by detect_publication_type when a conditional GET found the cached
+# scrape of the publication still current
+NOT_MODIFIED = "not_modified"
+
+_DATE_FORMATS = (
+    '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y',
+    '%d.%m.%Y', '%Y-%m-%dT%H:%M:%S'
+)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_cached(date_str):
+    """Parse a date string, memoized since publications repeat the same dates
+
+    Plain YYYY-MM-DD dates are built directly, skipping the strptime loop and
+    the exceptions it raises for each format that doesn't match.
+    """
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+        try:
+            return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+        except ValueError:
+            pass
+    
+    try:
+        # Handle ISO format dates
+        if 'T' in date_str:
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        
+        # Try other formats
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+                
+    except Exception as e:
+        logger.debug(f"Error parsing date '{date_str}': {e}")
+        
+    return None
+
 class UniversalEreklamkladScraper:
     """Universal scraper supporting both individual offers and catalog modes"""
     
-    def __init__(self):
+    def __init__(self, max_workers=8):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -27,67 +87,106 @@ class UniversalEreklamkladScraper:
             'Upgrade-Insecure-Requests': '1'
         })
         
+        # Larger keep-alive pool than the default 10, and never smaller than the
+        # worker count so concurrent fetches don't discard connections; backoff
+        # on transient errors, and exhausted retries still return the response
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=max(64, max_workers),
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET', 'HEAD'],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
         self.base_url = "https://ereklamblad.se"
         self.api_base = "https://api.ereklamblad.se"
         
+        # Concurrent offer fetches per publication
+        self.max_workers = max_workers
+        
         # Cache for weekly scraping
         self.last_scrape_date = None
         self.cached_offers = {}  # Store by publication_id
+        
+        # ETag/Last-Modified of the latest 200 publication page, by cache key,
+        # held until scrape_offers stores them with the offers
+        self._page_validators = {}
     
-    def detect_publication_type(self, retailer_slug, publication_id):
-        """Detect whether a publication uses individual offers or catalog mode"""
+    def _get_publication_page(self, retailer_slug, publication_id, conditional=False):
+        """GET a publication page, revalidating against the cached scrape if conditional"""
+        url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
+        cache_key = f"{retailer_slug}_{publication_id}"
+        
+        headers = {}
+        cache_entry = self.cached_offers.get(cache_key)
+        if conditional and cache_entry:
+            if cache_entry.get('etag'):
+                headers['If-None-Match'] = cache_entry['etag']
+            if cache_entry.get('last_modified'):
+                headers['If-Modified-Since'] = cache_entry['last_modified']
+        
+        response = self.session.get(url, headers=headers, timeout=15)
+        if response.status_code == 200:
+            self._page_validators[cache_key] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+        return response
+    
+    def detect_publication_type(self, retailer_slug, publication_id, conditional=False):
+        """Detect whether a publication uses individual offers or catalog mode
+        
+        Returns (publication_type, app_data) where app_data is the list of JSON
+        objects decoded from the page, so the scrape that follows needn't fetch
+        it again; it is None when the page could not be analyzed. With
+        conditional=True the page is revalidated against the cached scrape,
+        and NOT_MODIFIED is returned if the server answers 304.
+        """
         logger.info(f"Detecting publication type for {retailer_slug}/{publication_id}")
         
         try:
-            url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
-            response = self.session.get(url, timeout=15)
+            response = self._get_publication_page(retailer_slug, publication_id, conditional)
+            
+            if response.status_code == 304:
+                logger.info(f"Publication {retailer_slug}/{publication_id} not modified")
+                return NOT_MODIFIED, None
             
             if response.status_code != 200:
                 logger.warning(f"Failed to load publication page: {response.status_code}")
-                return "unknown"
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+                return "unknown", None
             
             # Analyze app-data structure
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
+            app_data = self._decode_app_data(response.content)
             
             individual_offers_found = False
             catalog_indicators_found = False
             
-            for element in app_data_elements:
+            for data in app_data:
                 try:
-                    content = element.get_text().strip()
-                    if not content:
-                        continue
-                    
-                    # Parse JSON segments
-                    json_segments = self._extract_json_segments(content)
+                    # Check for individual offer indicators
+                    offer_ids = self._extract_offer_ids_from_json(data)
+                    if offer_ids:
+                        individual_offers_found = True
+                        logger.info(f"Found {len(offer_ids)} individual offers")
                     
-                    for segment in json_segments:
-                        try:
-                            data = json.loads(segment)
-                            
-                            # Check for individual offer indicators
-                            offer_ids = self._extract_offer_ids_from_json(data)
-                            if offer_ids:
-                                individual_offers_found = True
-                                logger.info(f"Found {len(offer_ids)} individual offers")
-                            
-                            # Check for catalog indicators
-                            if isinstance(data, dict):
-                                if 'publication' in data:
-                                    pub_data = data['publication']
-                                    if isinstance(pub_data, dict):
-                                        if 'pageCount' in pub_data and pub_data.get('pageCount', 0) > 1:
-                                            catalog_indicators_found = True
-                                            logger.info(f"Found catalog with {pub_data['pageCount']} pages")
-                                        
-                                        if 'images' in pub_data and isinstance(pub_data['images'], list):
-                                            catalog_indicators_found = True
-                                            logger.info(f"Found catalog images: {len(pub_data['images'])} items")
-                            
-                        except json.JSONDecodeError:
-                            continue
+                    # Check for catalog indicators
+                    if isinstance(data, dict):
+                        if 'publication' in data:
+                            pub_data = data['publication']
+                            if isinstance(pub_data, dict):
+                                if 'pageCount' in pub_data and pub_data.get('pageCount', 0) > 1:
+                                    catalog_indicators_found = True
+                                    logger.info(f"Found catalog with {pub_data['pageCount']} pages")
+                                
+                                if 'images' in pub_data and isinstance(pub_data['images'], list):
+                                    catalog_indicators_found = True
+                                    logger.info(f"Found catalog images: {len(pub_data['images'])} items")
                 
                 except Exception as e:
                     logger.debug(f"Error analyzing app-data: {e}")
@@ -101,11 +200,11 @@ class UniversalEreklamkladScraper:
                 publication_type = "unknown"
             
             logger.info(f"Publication type detected: {publication_type}")
-            return publication_type
+            return publication_type, app_data
             
         except Exception as e:
             logger.error(f"Error detecting publication type: {e}")
-            return "unknown"
+            return "unknown", None
     
     def scrape_offers(self, retailer_slug, publication_id, force_refresh=False):
         """Universal offer scraping supporting both modes"""
@@ -121,27 +220,40 @@ class UniversalEreklamkladScraper:
         
         logger.info(f"Starting fresh scrape for {retailer_slug}/{publication_id}")
         
-        # Detect publication type
-        pub_type = self.detect_publication_type(retailer_slug, publication_id)
+        # Detect publication type; an expired cache entry is revalidated with
+        # its ETag/Last-Modified so an unchanged publication costs one 304
+        pub_type, app_data = self.detect_publication_type(
+            retailer_slug, publication_id, conditional=not force_refresh
+        )
+        
+        if pub_type == NOT_MODIFIED:
+            cache_entry = self.cached_offers[cache_key]
+            cache_entry['timestamp'] = now
+            logger.info(f"Reusing {len(cache_entry['offers'])} cached offers for {cache_key}")
+            return cache_entry['offers']
         
         offers = []
         
+        # The catalog scrape works from the app-data detection already decoded
         if pub_type == "individual_offers":
             offers = self._scrape_individual_offers(retailer_slug, publication_id)
         elif pub_type == "catalog":
-            offers = self._scrape_catalog_offers(retailer_slug, publication_id)
+            offers = self._scrape_catalog_offers(retailer_slug, publication_id, preparsed=app_data)
         else:
             logger.warning(f"Unknown publication type, trying both methods")
             # Try individual offers first
             offers = self._scrape_individual_offers(retailer_slug, publication_id)
             if not offers:
-                offers = self._scrape_catalog_offers(retailer_slug, publication_id)
+                offers = self._scrape_catalog_offers(retailer_slug, publication_id, preparsed=app_data)
         
-        # Cache results
+        # Cache results along with the page validators for the next revalidation
+        validators = self._page_validators.pop(cache_key, {})
         self.cached_offers[cache_key] = {
             'offers': offers,
             'timestamp': now,
-            'type': pub_type
+            'type': pub_type,
+            'etag': validators.get('etag'),
+            'last_modified': validators.get('last_modified')
         }
         
         logger.info(f"Scraping complete for {cache_key}: {len(offers)} offers found")
@@ -166,91 +278,118 @@ class UniversalEreklamkladScraper:
             
             offer_ids = self._discover_offers_by_patterns(retailer_slug, publication_id, seed_ids)
         
-        # Extract data for each offer
-        for offer_id in offer_ids:
-            offer_data = self._extract_individual_offer_data(retailer_slug, publication_id, offer_id)
-            if offer_data:
-                offers.append(offer_data)
+        # Extract data for each offer; the fetches are network-bound, so run
+        # them concurrently over the session and keep the discovery order
+        if offer_ids:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(offer_ids))) as executor:
+                results = executor.map(
+                    lambda offer_id: self._extract_individual_offer_data(retailer_slug, publication_id, offer_id),
+                    offer_ids
+                )
+                offers.extend(offer_data for offer_data in results if offer_data)
         
         return offers
     
-    def _scrape_catalog_offers(self, retailer_slug, publication_id):
-        """Scrape catalog-style offers (like Coop)"""
+    def _scrape_catalog_offers(self, retailer_slug, publication_id, preparsed=None):
+        """Scrape catalog-style offers (like Coop)
+        
+        preparsed is the publication page's decoded app-data when the caller
+        already has it; the page is only fetched when it is None.
+        """
         logger.info("Using catalog mode")
         
         offers = []
         
         try:
             url = f"{self.base_url}/{retailer_slug}?publication={publication_id}"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
-                return offers
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            app_data_elements = soup.find_all(id=lambda x: x and 'app-data' in x)
             
-            for element in app_data_elements:
-                content = element.get_text().strip()
-                if not content:
-                    continue
+            if preparsed is None:
+                response = self._get_publication_page(retailer_slug, publication_id)
                 
-                json_segments = self._extract_json_segments(content)
+                if response.status_code != 200:
+                    return offers
                 
-                for segment in json_segments:
-                    try:
-                        data = json.loads(segment)
+                preparsed = self._decode_app_data(response.content)
+            
+            for data in preparsed:
+                try:
+                    if isinstance(data, dict) and 'publication' in data:
+                        pub_data = data['publication']
                         
-                        if isinstance(data, dict) and 'publication' in data:
-                            pub_data = data['publication']
-                            
-                            # Extract catalog information
-                            catalog_info = {
-                                'id': pub_data.get('publicId', publication_id),
-                                'publication_id': publication_id,
-                                'business_id': retailer_slug.lower().replace('-', '_'),
-                                'name': pub_data.get('name', f'{retailer_slug} Catalog'),
-                                'business_name': retailer_slug.replace('-', ' ').title(),
-                                'type': 'catalog',
-                                'page_count': pub_data.get('pageCount', 0),
-                                'valid_from': self._parse_date(pub_data.get('validFrom')),
-                                'valid_until': self._parse_date(pub_data.get('validUntil')),
-                                'images': pub_data.get('images', []),
-                                'url': url
-                            }
-                            
-                            # For catalogs, we create one "offer" representing the entire catalog
-                            # In the future, this could be enhanced to extract individual products from catalog pages
-                            offers.append(catalog_info)
-                            logger.info(f"Extracted catalog: {catalog_info['name']} ({catalog_info['page_count']} pages)")
-                            
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        logger.debug(f"Error processing catalog data: {e}")
-                        continue
+                        # Extract catalog information
+                        catalog_info = {
+                            'id': pub_data.get('publicId', publication_id),
+                            'publication_id': publication_id,
+                            'business_id': retailer_slug.lower().replace('-', '_'),
+                            'name': pub_data.get('name', f'{retailer_slug} Catalog'),
+                            'business_name': retailer_slug.replace('-', ' ').title(),
+                            'type': 'catalog',
+                            'page_count': pub_data.get('pageCount', 0),
+                            'valid_from': self._parse_date(pub_data.get('validFrom')),
+                            'valid_until': self._parse_date(pub_data.get('validUntil')),
+                            'images': pub_data.get('images', []),
+                            'url': url
+                        }
+                        
+                        # For catalogs, we create one "offer" representing the entire catalog
+                        # In the future, this could be enhanced to extract individual products from catalog pages
+                        offers.append(catalog_info)
+                        logger.info(f"Extracted catalog: {catalog_info['name']} ({catalog_info['page_count']} pages)")
+                        
+                except Exception as e:
+                    logger.debug(f"Error processing catalog data: {e}")
+                    continue
         
         except Exception as e:
             logger.error(f"Error scraping catalog: {e}")
         
         return offers
     
+    def _app_data_texts(self, page):
+        """Return the text of each app-data element in the raw page bytes
+        
+        Only these elements are needed, so they are cut out with a regex rather
+        than by parsing the whole document into a tree. Falls back to a full
+        BeautifulSoup parse when the regex finds nothing, e.g. for nested
+        same-name tags or unusual markup.
+        """
+        texts = []
+        for tag, raw in _APP_DATA_RE.findall(page):
+            text = raw.decode('utf-8', errors='replace')
+            # Script contents are raw text; other elements may carry entities
+            texts.append(text if tag.lower() == b'script' else html.unescape(text))
+        if not texts:
+            soup = BeautifulSoup(page, _HTML_PARSER)
+            texts = [
+                element.get_text()
+                for element in soup.find_all(id=lambda x: x and 'app-data' in x)
+            ]
+        return texts
+    
+    def _decode_app_data(self, page):
+        """Decode every JSON object held in the page's app-data elements"""
+        app_data = []
+        for element in self._app_data_texts(page):
+            content = element.strip()
+            if content:
+                app_data.extend(self._extract_json_segments(content))
+        return app_data
+    
     def _extract_json_segments(self, content):
-        """Extract valid JSON segments from content"""
+        """Decode the JSON objects embedded in content"""
         json_segments = []
-        brace_level = 0
-        start_pos = 0
-        
-        for pos, char in enumerate(content):
-            if char == '{':
-                if brace_level == 0:
-                    start_pos = pos
-                brace_level += 1
-            elif char == '}':
-                brace_level -= 1
-                if brace_level == 0:
-                    json_segment = content[start_pos:pos+1]
-                    json_segments.append(json_segment)
+        pos = content.find('{')
+        
+        # Let the C decoder find each object's end instead of counting braces
+        # in Python; this also handles braces inside strings correctly
+        while pos != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(content, pos)
+            except json.JSONDecodeError:
+                pos = content.find('{', pos + 1)
+                continue
+            json_segments.append(obj)
+            pos = content.find('{', end)
         
         return json_segments
     
@@ -292,28 +431,8 @@ class UniversalEreklamkladScraper:
         """Parse date string to datetime object"""
         if not date_str:
             return None
-            
-        try:
-            # Handle ISO format dates
-            if 'T' in str(date_str):
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            
-            # Try other formats
-            date_formats = [
-                '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', 
-                '%d.%m.%Y', '%Y-%m-%dT%H:%M:%S'
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    return datetime.strptime(str(date_str), fmt)
-                except ValueError:
-                    continue
-                    
-        except Exception as e:
-            logger.debug(f"Error parsing date '{date_str}': {e}")
-            
-        return None
+        
+        return _parse_date_cached(str(date_str))
 
 # Test the universal scraper
 if __name__ == "__main__":